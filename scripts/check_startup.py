@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from device_catalog import cache_file_for
+from ingest_benchmark import generate_issue_body
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(SCRIPTS_DIR, 'process-new-machine.py')
+DEFAULT_DEVICES_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'data', 'devices')
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_CHECK_BUDGET_MS = 75.0
+DEFAULT_COLD_CHECK_BUDGET_MS = 500.0
+DEFAULT_RUNS = 15
+# Modules the --check path must never import
+FORBIDDEN_ON_CHECK = ['yaml', 'yaml_emitter', 'concurrent.futures', 'ingest_metrics', 'cProfile', 'tracemalloc', 'hashlib', 'json']
+
+
+def time_command(args, runs, drop_file=None):
+    timings = []
+    for _ in range(runs):
+        # Removing the catalog cache before each run times the cold path
+        if drop_file and os.path.exists(drop_file):
+            os.remove(drop_file)
+        start = time.perf_counter()
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def imported_modules(args):
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and not line.endswith('imported package'):
+            modules.add(line.rsplit('|', 1)[-1].strip())
+    return result.returncode, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that process-new-machine.py stays within its startup budget')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS, help='Maximum median milliseconds for startup (--help)')
+    parser.add_argument('--check-budget', type=float, default=DEFAULT_CHECK_BUDGET_MS, help='Maximum median milliseconds for a --check run on one issue with a warm catalog cache')
+    parser.add_argument('--cold-check-budget', type=float, default=DEFAULT_COLD_CHECK_BUDGET_MS, help='Maximum median milliseconds for a --check run with no catalog cache')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Catalog the --check runs compare against')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Number of runs per measurement')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        body_file = os.path.join(directory, 'issue_body.txt')
+        with open(body_file, 'w') as f:
+            f.write(generate_issue_body(random.Random(0), 0))
+        check_args = [SCRIPT, body_file, '--check', '--output-dir', os.path.abspath(args.devices_dir)]
+        cache_file = cache_file_for(args.devices_dir)
+
+        # Run once untimed so the bytecode and catalog caches are warm, as they are on any real run
+        imported_modules(check_args)
+        returncode, modules = imported_modules(check_args)
+        if returncode != 0:
+            failures.append(f"--check exited with {returncode}")
+        for module in FORBIDDEN_ON_CHECK:
+            if module in modules:
+                failures.append(f"--check imported {module}")
+
+        interpreter = time_command([sys.executable, '-c', 'pass'], args.runs)
+        startup = time_command([sys.executable, SCRIPT, '--help'], args.runs)
+        check = time_command([sys.executable] + check_args, args.runs)
+        cold_check = time_command([sys.executable] + check_args, args.runs, drop_file=cache_file)
+
+    print(f"{'interpreter':<12} {interpreter:8.1f}ms")
+    print(f"{'startup':<12} {startup:8.1f}ms (budget {args.budget:.0f}ms, {startup - interpreter:.1f}ms over a bare interpreter)")
+    print(f"{'--check':<12} {check:8.1f}ms (budget {args.check_budget:.0f}ms, {len(modules)} modules imported)")
+    print(f"{'cold --check':<12} {cold_check:8.1f}ms (budget {args.cold_check_budget:.0f}ms, no catalog cache)")
+
+    if startup > args.budget:
+        failures.append(f"startup took {startup:.1f}ms, over the {args.budget:.0f}ms budget")
+    if check > args.check_budget:
+        failures.append(f"--check took {check:.1f}ms, over the {args.check_budget:.0f}ms budget")
+    if cold_check > args.cold_check_budget:
+        failures.append(f"cold --check took {cold_check:.1f}ms, over the {args.cold_check_budget:.0f}ms budget")
+
+    for failure in failures:
+        print(f"Error: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
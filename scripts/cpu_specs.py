@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import argparse
+import copy
+import json
+import re
+import sys
+from collections import Counter
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_devices
+
+SPEC_FIELDS = ['cores', 'threads', 'base_clock', 'boost_clock', 'tdp', 'architecture', 'core_config']
+NOISE_TOKENS = {'intel', 'amd', 'core', 'processor', 'cpu', 'r', 'tm'}
+TOKEN_REGEX = re.compile(r'[a-z0-9]+')
+TRIE_END = '$'
+
+
+def cpu_key(brand, model):
+    tokens = [token for token in TOKEN_REGEX.findall(str(model).lower()) if token not in NOISE_TOKENS]
+    return f"{str(brand).lower()}|{' '.join(tokens)}"
+
+
+def _most_common(values):
+    counts = Counter(json.dumps(value, sort_keys=True) for value in values)
+    winner = counts.most_common(1)[0][0]
+    return next(value for value in values if json.dumps(value, sort_keys=True) == winner)
+
+
+def build_cpu_index(devices):
+    grouped = {}
+    for device in devices:
+        cpu = device.get('cpu') or {}
+        if not cpu.get('brand') or not cpu.get('model') or cpu['model'] == 'DIY':
+            continue
+        grouped.setdefault(cpu_key(cpu['brand'], cpu['model']), []).append(cpu)
+
+    specs = {}
+    trie = {}
+    for key, cpus in grouped.items():
+        spec = {'brand': _most_common([cpu['brand'] for cpu in cpus]), 'model': _most_common([cpu['model'] for cpu in cpus])}
+        for field in SPEC_FIELDS:
+            values = [cpu[field] for cpu in cpus if cpu.get(field) is not None]
+            if values:
+                spec[field] = _most_common(values)
+        spec['devices'] = len(cpus)
+        specs[key] = spec
+
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[TRIE_END] = key
+
+    return {'specs': specs, 'trie': trie, 'memo': {}}
+
+
+def lookup_cpu(index, brand, model):
+    if not brand or not model:
+        return None
+
+    memo_key = (brand, model)
+    if memo_key not in index['memo']:
+        index['memo'][memo_key] = index['specs'].get(cpu_key(brand, model))
+
+    # Callers may embed parts of the spec in their output, so never hand out the shared copy
+    spec = index['memo'][memo_key]
+    return copy.deepcopy(spec) if spec else None
+
+
+def suggest_cpus(index, brand, model, limit=5):
+    node = index['trie']
+    for char in cpu_key(brand, model):
+        node = node.get(char)
+        if node is None:
+            return []
+
+    keys = []
+    stack = [node]
+    while stack and len(keys) < limit:
+        node = stack.pop()
+        for char in sorted(node, reverse=True):
+            if char == TRIE_END:
+                keys.append(node[char])
+            else:
+                stack.append(node[char])
+    return [index['specs'][key]['model'] for key in keys[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up CPU specs known from the device catalog')
+    parser.add_argument('model', help='CPU model, or a prefix of one')
+    parser.add_argument('--brand', required=True, help='CPU brand, e.g. Intel or AMD')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    args = parser.parse_args()
+
+    try:
+        index = build_cpu_index(load_devices(args.devices_dir, args.cache_file))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    spec = lookup_cpu(index, args.brand, args.model)
+    if spec:
+        print(json.dumps(spec, indent=2))
+        return 0
+
+    suggestions = suggest_cpus(index, args.brand, args.model)
+    if suggestions:
+        print(f"No exact match for {args.brand} {args.model}. Did you mean: {', '.join(suggestions)}")
+    else:
+        print(f"No known CPU matches {args.brand} {args.model}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+STATS_VERSION = 1
+ETHERNET_SPEED_REGEX = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([GM])b', re.IGNORECASE)
+YEAR_REGEX = re.compile(r'(\d{4})')
+PERCENTILES = [10, 50, 90]
+TOP_DEVICES = 5
+
+# Numeric columns read straight from the device data
+NUMBER_COLUMNS = {
+    'width': ('dimensions', 'width'),
+    'depth': ('dimensions', 'depth'),
+    'height': ('dimensions', 'height'),
+    'stated_volume': ('dimensions', 'volume'),
+    'cores': ('cpu', 'cores'),
+    'threads': ('cpu', 'threads'),
+    'base_clock': ('cpu', 'base_clock'),
+    'boost_clock': ('cpu', 'boost_clock'),
+    'tdp': ('cpu', 'tdp'),
+    'max_memory': ('memory', 'max_capacity'),
+    'memory_slots': ('memory', 'slots'),
+}
+GROUP_COLUMNS = ['brand', 'architecture', 'year']
+METRICS = {
+    'volume_l': 'Volume (L)',
+    'threads_per_l': 'Threads per litre',
+    'boost_core_ghz_per_w': 'Boost GHz x cores per TDP watt',
+    'memory_per_slot_gb': 'Max memory per slot (GB)',
+    'ethernet_ports': 'Ethernet ports',
+    'ethernet_gbps': 'Ethernet bandwidth (Gbps)',
+}
+
+
+def _get(data, keys):
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def ethernet_mbps(speed):
+    match = ETHERNET_SPEED_REGEX.match(str(speed or ''))
+    if not match:
+        return 0.0
+    return float(match.group(1)) * (1000 if match.group(2).upper() == 'G' else 1)
+
+
+def _ethernet_totals(data):
+    ethernet = _get(data, ('networking', 'ethernet'))
+    ports = bandwidth = 0.0
+    for entry in ethernet if isinstance(ethernet, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        count = _number(entry.get('ports'))
+        count = 1.0 if np.isnan(count) else count
+        ports += count
+        bandwidth += count * ethernet_mbps(entry.get('speed'))
+    return ports, bandwidth / 1000
+
+
+def _categories(values):
+    # Codes into a sorted label list; missing values get code -1. Codes that fit in
+    # int16 let NumPy's stable sort use radix sort when grouping
+    labels = sorted({value for value in values if value is not None})
+    lookup = {label: code for code, label in enumerate(labels)}
+    dtype = np.int16 if len(labels) < np.iinfo(np.int16).max else np.int32
+    return np.array([lookup.get(value, -1) for value in values], dtype=dtype), labels
+
+
+def load_columns(catalog):
+    # The only per-device Python loop: everything after this works on whole columns
+    paths = sorted(catalog)
+    count = len(paths)
+    numbers = {name: np.full(count, np.nan) for name in NUMBER_COLUMNS}
+    ethernet = np.zeros((count, 2))
+    groups = {name: [None] * count for name in GROUP_COLUMNS}
+    ids = []
+
+    for row, path in enumerate(paths):
+        data = catalog[path] if isinstance(catalog[path], dict) else {}
+        ids.append(data.get('id') or path)
+        for name, keys in NUMBER_COLUMNS.items():
+            numbers[name][row] = _number(_get(data, keys))
+        ethernet[row] = _ethernet_totals(data)
+        groups['brand'][row] = data.get('brand') or None
+        groups['architecture'][row] = _get(data, ('cpu', 'architecture')) or None
+        year = YEAR_REGEX.search(str(data.get('release_date') or ''))
+        groups['year'][row] = year.group(1) if year else None
+
+    columns = dict(numbers, ids=np.array(ids, dtype=object), ethernet_ports=ethernet[:, 0], ethernet_gbps=ethernet[:, 1])
+    for name, values in groups.items():
+        columns[name], columns[f"{name}_labels"] = _categories(values)
+    return columns
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def derive_metrics(columns):
+    # Dimensions are in millimetres; a stated volume only fills in for missing dimensions
+    volume = columns['width'] * columns['depth'] * columns['height'] / 1e6
+    volume = np.where(np.isnan(volume), columns['stated_volume'], volume)
+    volume = np.where(volume > 0, volume, np.nan)
+    return {
+        'volume_l': volume,
+        'threads_per_l': _ratio(columns['threads'], volume),
+        'boost_core_ghz_per_w': _ratio(columns['boost_clock'] * columns['cores'], columns['tdp']),
+        'memory_per_slot_gb': _ratio(columns['max_memory'], columns['memory_slots']),
+        'ethernet_ports': columns['ethernet_ports'],
+        'ethernet_gbps': columns['ethernet_gbps'],
+    }
+
+
+def _round(values):
+    return [round(float(value), 3) for value in values]
+
+
+def summarize(values, ids):
+    present = ~np.isnan(values)
+    count = int(present.sum())
+    if not count:
+        return {'count': 0}
+    known = values[present]
+    # Partition for the cutoff so only the few candidates get sorted; ties go to the earlier device
+    limit = min(TOP_DEVICES, count)
+    cutoff = np.partition(known, count - limit)[count - limit]
+    candidates = np.flatnonzero(values >= cutoff)
+    top = candidates[np.lexsort((candidates, -values[candidates]))][:limit]
+    summary = {
+        'count': count,
+        'mean': round(float(known.mean()), 3),
+        'min': round(float(known.min()), 3),
+        'max': round(float(known.max()), 3),
+    }
+    summary.update(zip((f"p{p}" for p in PERCENTILES), _round(np.percentile(known, PERCENTILES))))
+    summary['top'] = [{'id': ids[row], 'value': round(float(values[row]), 3)} for row in top]
+    return summary
+
+
+def group_aggregates(codes, labels, values, order=None):
+    # `order` sorts the values (NaN last) and can be shared across group columns; a
+    # stable sort of the small integer codes then leaves every group's slice sorted
+    order = np.argsort(values) if order is None else order
+    order = order[(codes[order] >= 0) & ~np.isnan(values[order])]
+    if not len(order):
+        return {}
+    order = order[np.argsort(codes[order], kind='stable')]
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_values)])
+    sums = np.add.reduceat(sorted_values, starts)
+    medians = (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2
+    ends = starts + counts - 1
+
+    return {
+        labels[code]: {'count': int(n), 'mean': round(float(total / n), 3), 'median': round(float(median), 3),
+                       'min': round(float(sorted_values[start]), 3), 'max': round(float(sorted_values[end]), 3)}
+        for code, n, total, median, start, end in zip(sorted_codes[starts], counts, sums, medians, starts, ends)
+    }
+
+
+def build_stats(columns, metrics=None):
+    metrics = derive_metrics(columns) if metrics is None else metrics
+    ids = columns['ids']
+    stats = {
+        'version': STATS_VERSION,
+        'device_count': len(ids),
+        'metrics': {name: dict(summarize(metrics[name], ids), label=label) for name, label in METRICS.items()},
+        'groups': {},
+    }
+    orders = {name: np.argsort(metrics[name]) for name in METRICS}
+    for group in GROUP_COLUMNS:
+        codes, labels = columns[group], columns[f"{group}_labels"]
+        device_counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        entries = {label: {'devices': int(device_counts[code])} for code, label in enumerate(labels)}
+        for name in METRICS:
+            for label, aggregate in group_aggregates(codes, labels, metrics[name], orders[name]).items():
+                entries[label][name] = aggregate
+        stats['groups'][group] = entries
+    return stats
+
+
+def _group_table(stats, group, metric):
+    rows = sorted(stats['groups'][group].items(), key=lambda item: -item[1]['devices'])
+    lines = [f"{group:<20} {'devices':>7} {metric:>22}"]
+    for label, entry in rows[:10]:
+        aggregate = entry.get(metric)
+        value = f"{aggregate['median']:.2f} median" if aggregate else '-'
+        lines.append(f"{str(label)[:20]:<20} {entry['devices']:>7} {value:>22}")
+    return '\n'.join(lines)
+
+
+def format_stats(stats):
+    lines = [f"{stats['device_count']} devices", '']
+    lines.append(f"{'metric':<32} {'count':>5} {'p10':>8} {'median':>8} {'p90':>8} {'max':>8}")
+    for name, summary in stats['metrics'].items():
+        if not summary['count']:
+            lines.append(f"{summary['label']:<32} {0:>5}")
+            continue
+        lines.append(f"{summary['label']:<32} {summary['count']:>5} {summary['p10']:>8.2f} "
+                     f"{summary['p50']:>8.2f} {summary['p90']:>8.2f} {summary['max']:>8.2f}")
+    lines += ['', _group_table(stats, 'brand', 'volume_l'), '', _group_table(stats, 'architecture', 'boost_core_ghz_per_w')]
+    return '\n'.join(lines)
+
+
+def benchmark(columns, size):
+    # Tile the real columns up to `size` devices to time the vectorized passes on a large catalog
+    rows = np.resize(np.arange(len(columns['ids'])), size)
+    scaled = {name: (value if name.endswith('_labels') else value[rows]) for name, value in columns.items()}
+    start = time.perf_counter()
+    metrics = derive_metrics(scaled)
+    derived = time.perf_counter() - start
+    build_stats(scaled, metrics)
+    return derived, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute derived metrics and brand, architecture and year aggregates over the catalog')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--output', help='Write the stats artifact as JSON to this file')
+    parser.add_argument('--benchmark', type=int, metavar='DEVICES', help='Also time the metric and aggregate passes on the catalog tiled up to this many devices')
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        columns = load_columns(load_catalog(args.devices_dir, args.cache_file))
+        loaded = time.perf_counter() - start
+        stats = build_stats(columns)
+        elapsed = time.perf_counter() - start
+
+        if args.output:
+            directory = os.path.dirname(args.output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(stats, f, separators=(',', ':'))
+        print(format_stats(stats))
+        print(f"\nColumns loaded in {loaded * 1000:.1f}ms, stats computed in {(elapsed - loaded) * 1000:.1f}ms", file=sys.stderr)
+
+        if args.benchmark:
+            derived, total = benchmark(columns, args.benchmark)
+            print(f"{args.benchmark} devices: metrics in {derived * 1000:.1f}ms, metrics and aggregates in {total * 1000:.1f}ms", file=sys.stderr)
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, iter_device_files, load_catalog
+
+DEFAULT_BUNDLE = '.cache/devices.bundle'
+BUNDLE_MAGIC = b'DEVBNDL1'
+INDEX_MAGIC = b'DEVBIDX1'
+# Bundle: a header with a random token, then records of (payload length, CRC-32)
+# followed by a JSON payload {"id", "path", "data"} plus, for devices packed from
+# the YAML tree, the file's own "text" so comments and formatting survive an
+# unpack. Records are only ever
+# appended; the last one for an id wins and {"id", "deleted": true} removes it
+HEADER = struct.Struct('<8s16s')
+RECORD = struct.Struct('<II')
+# Index (<bundle>.idx): magic, the token of the bundle it was built for and how
+# many bytes of it it covers, then one entry per live device sorted by a 64-bit
+# hash of its id. Records past the covered length are scanned when opening
+INDEX_HEADER = struct.Struct('<8s16sQQ')
+INDEX_ENTRY = struct.Struct('<QQI4x')
+LOOKUP_ROUNDS = 10000
+
+
+def index_path(path):
+    return f"{path}.idx"
+
+
+def id_key(device_id):
+    return int.from_bytes(hashlib.blake2b(device_id.encode(), digest_size=8).digest(), 'little')
+
+
+def _id_prefix(device_id):
+    # Every payload starts with its id, so a lookup can confirm a hit without decoding it
+    return b'{"id":' + json.dumps(device_id, ensure_ascii=False).encode() + b','
+
+
+def _check_keys(value, path):
+    # JSON would quietly turn other keys into strings, and the YAML written back would differ
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ValueError(f"{path}: key {key!r} is not a string and cannot be stored in a bundle")
+            _check_keys(item, path)
+    elif isinstance(value, list):
+        for item in value:
+            _check_keys(item, path)
+
+
+def encode_payload(payload):
+    _check_keys(payload, payload['id'])
+    try:
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+    except TypeError as e:
+        raise ValueError(f"{payload['id']}: {e}") from e
+
+
+def device_payload(rel_path, data, text=None):
+    payload = {'id': data['id'], 'path': rel_path, 'data': data}
+    if text is not None:
+        payload['text'] = text
+    return encode_payload(payload)
+
+
+def read_device_texts(devices_dir, rel_paths):
+    texts = {}
+    for rel_path in rel_paths:
+        with open(os.path.join(devices_dir, rel_path), 'r') as f:
+            texts[rel_path] = f.read()
+    return texts
+
+
+def _record(body):
+    return RECORD.pack(len(body), zlib.crc32(body)) + body
+
+
+def _check_path(rel_path):
+    # Bundles can come from elsewhere; never let one write outside the devices directory
+    parts = rel_path.replace('\\', '/').split('/')
+    if os.path.isabs(rel_path) or '..' in parts or not rel_path.endswith(('.yaml', '.yml')):
+        raise ValueError(f"Refusing to unpack a device to {rel_path!r}")
+    return rel_path
+
+
+class DeviceBundle:
+    # Read side: the bundle and its index are memory-mapped, lookups binary-search
+    # the index and view() hands out a slice of the mapping without copying it.
+    # Views must be released before the bundle is closed
+    def __init__(self, path=DEFAULT_BUNDLE):
+        self.path = path
+        self._index = self._index_view = None
+        self._count = 0
+        with open(path, 'rb') as f:
+            try:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is not a device bundle") from None
+        self._view = memoryview(self._data)
+        if len(self._data) < HEADER.size or HEADER.unpack_from(self._data, 0)[0] != BUNDLE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a device bundle")
+        self.token = HEADER.unpack_from(self._data, 0)[1]
+        self._recent = {}
+        self._scan(self._read_index())
+
+    def _read_index(self):
+        try:
+            with open(index_path(self.path), 'rb') as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return HEADER.size
+        if len(index) >= INDEX_HEADER.size:
+            magic, token, covered, count = INDEX_HEADER.unpack_from(index, 0)
+            if (magic == INDEX_MAGIC and token == self.token and HEADER.size <= covered <= len(self._data)
+                    and len(index) == INDEX_HEADER.size + count * INDEX_ENTRY.size):
+                self._index, self._index_view, self._count = index, memoryview(index), count
+                return covered
+        # Left behind by an earlier generation of the bundle: ignore it and scan everything
+        index.close()
+        return HEADER.size
+
+    def _scan(self, offset):
+        end = len(self._data)
+        while offset + RECORD.size <= end:
+            length, crc = RECORD.unpack_from(self._data, offset)
+            start = offset + RECORD.size
+            if start + length > end or zlib.crc32(self._view[start:start + length]) != crc:
+                break
+            payload = json.loads(str(self._view[start:start + length], 'utf-8'))
+            self._recent[payload['id']] = None if payload.get('deleted') else (offset, length)
+            offset = start + length
+        # Anything after the last good record is a torn append; the next write truncates it
+        self.end = offset
+        self.torn = end - offset
+
+    def _entry(self, position):
+        return INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + position * INDEX_ENTRY.size)
+
+    def locate(self, device_id):
+        if device_id in self._recent:
+            return self._recent[device_id]
+        key = id_key(device_id)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            entry_key, offset, length = self._entry(low)
+            prefix = _id_prefix(device_id)
+            start = offset + RECORD.size
+            if entry_key == key and self._data[start:start + len(prefix)] == prefix:
+                return offset, length
+        return None
+
+    def view(self, device_id):
+        location = self.locate(device_id)
+        if location is None:
+            return None
+        offset, length = location
+        return self._view[offset + RECORD.size:offset + RECORD.size + length]
+
+    def matches(self, device_id, body):
+        view = self.view(device_id)
+        if view is None:
+            return None
+        with view:
+            return view == body
+
+    def _decode(self, offset, length):
+        with self._view[offset + RECORD.size:offset + RECORD.size + length] as view:
+            return json.loads(str(view, 'utf-8'))
+
+    def record(self, device_id):
+        location = self.locate(device_id)
+        return self._decode(*location) if location else None
+
+    def get(self, device_id):
+        record = self.record(device_id)
+        return record['data'] if record else None
+
+    def live_entries(self):
+        # (key, offset, length) of every live record, in the order they were written
+        shadowed = {id_key(device_id) for device_id in self._recent}
+        entries = []
+        if self._count:
+            with self._index_view[INDEX_HEADER.size:] as view:
+                entries = [entry for entry in INDEX_ENTRY.iter_unpack(view) if entry[0] not in shadowed]
+        entries += [(id_key(device_id), *location) for device_id, location in self._recent.items() if location]
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def records(self):
+        for _, offset, length in self.live_entries():
+            yield self._decode(offset, length)
+
+    def record_bytes(self, offset, length):
+        return self._view[offset:offset + RECORD.size + length]
+
+    def __len__(self):
+        return len(self.live_entries())
+
+    def close(self):
+        for view in (self._view, self._index_view):
+            if view is not None:
+                view.release()
+        self._data.close()
+        if self._index is not None:
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def open_bundle(path):
+    return DeviceBundle(path) if os.path.exists(path) else None
+
+
+def _write_index_temp(path, token, covered, entries):
+    entries = sorted(entries)
+    for earlier, later in zip(entries, entries[1:]):
+        if earlier[0] == later[0]:
+            raise ValueError(f"Two device ids in {path} share the index key {earlier[0]:016x}")
+    tmp_path = f"{index_path(path)}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, token, covered, len(entries)))
+        for entry in entries:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+
+def _write_bundle_files(path, records):
+    # records: (index key, encoded record). Both files go to temporary names first;
+    # until the index is swapped in, its old token makes readers scan instead
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    token = os.urandom(16)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    entries = []
+    offset = HEADER.size
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(BUNDLE_MAGIC, token))
+            for key, record in records:
+                f.write(record)
+                entries.append((key, offset, len(record) - RECORD.size))
+                offset += len(record)
+            f.flush()
+            os.fsync(f.fileno())
+        index_tmp = _write_index_temp(path, token, offset, entries)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    os.replace(index_tmp, index_path(path))
+    return offset
+
+
+def write_bundle(path, bodies):
+    # bodies: (device id, encoded payload); replaces any existing bundle
+    return _write_bundle_files(path, ((id_key(device_id), _record(body)) for device_id, body in bodies))
+
+
+def reindex(path):
+    with DeviceBundle(path) as bundle:
+        tmp_path = _write_index_temp(path, bundle.token, bundle.end, bundle.live_entries())
+    os.replace(tmp_path, index_path(path))
+
+
+def append_bodies(path, bodies):
+    if not bodies:
+        return
+    if not os.path.exists(path):
+        write_bundle(path, bodies)
+        return
+    with DeviceBundle(path) as bundle:
+        end, torn = bundle.end, bundle.torn
+    if torn:
+        print(f"Warning: dropping {torn} bytes of an interrupted write at the end of {path}", file=sys.stderr)
+    with open(path, 'r+b') as f:
+        f.truncate(end)
+        f.seek(end)
+        for _, body in bodies:
+            f.write(_record(body))
+        f.flush()
+        os.fsync(f.fileno())
+    reindex(path)
+
+
+def update_devices(path, items, texts=None):
+    # Appends the (rel_path, data) items whose stored record differs; returns
+    # 'inserted', 'updated' or 'unchanged' for each. texts maps rel_path to the file text
+    statuses = []
+    bodies = []
+    texts = texts or {}
+    bundle = open_bundle(path)
+    try:
+        for rel_path, data in items:
+            body = device_payload(rel_path, data, texts.get(rel_path))
+            same = bundle.matches(data['id'], body) if bundle else None
+            if same:
+                statuses.append('unchanged')
+                continue
+            statuses.append('inserted' if same is None else 'updated')
+            bodies.append((data['id'], body))
+    finally:
+        if bundle:
+            bundle.close()
+    append_bodies(path, bodies)
+    return statuses
+
+
+def pack_catalog(path, catalog, prune=True, rebuild=False, devices_dir=None):
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'skipped': 0}
+    items = []
+    seen = set()
+    for rel_path, data in catalog.items():
+        if not isinstance(data, dict) or not data.get('id') or data['id'] in seen:
+            stats['skipped'] += 1
+            continue
+        seen.add(data['id'])
+        items.append((rel_path, data))
+    texts = read_device_texts(devices_dir, [rel_path for rel_path, _ in items]) if devices_dir else {}
+
+    if rebuild or not os.path.exists(path):
+        write_bundle(path, [(data['id'], device_payload(rel_path, data, texts.get(rel_path))) for rel_path, data in items])
+        stats['inserted'] = len(items)
+        return stats
+
+    for status in update_devices(path, items, texts):
+        stats[status] += 1
+    if prune:
+        with DeviceBundle(path) as bundle:
+            removed = [record['id'] for record in bundle.records() if record['id'] not in seen]
+        append_bodies(path, [(device_id, encode_payload({'id': device_id, 'deleted': True})) for device_id in removed])
+        stats['deleted'] = len(removed)
+    return stats
+
+
+def compact(path):
+    # Copies the live records byte for byte out of the mapping into a fresh bundle
+    with DeviceBundle(path) as bundle:
+        before = len(bundle._data)
+        entries = bundle.live_entries()
+        views = [(key, bundle.record_bytes(offset, length)) for key, offset, length in entries]
+        try:
+            after = _write_bundle_files(path, views)
+        finally:
+            for _, view in views:
+                view.release()
+    return {'devices': len(entries), 'before': before, 'after': after}
+
+
+def load_bundle_catalog(path=DEFAULT_BUNDLE):
+    # Same shape as device_catalog.load_catalog: {rel_path: data}
+    with DeviceBundle(path) as bundle:
+        return dict(sorted((record['path'], record['data']) for record in bundle.records()))
+
+
+def record_text(record):
+    # The file as it was packed, or the emitter's rendering for devices written by ingest
+    if 'text' in record:
+        return record['text']
+    from yaml_emitter import dump_device
+
+    return dump_device(record['data'])
+
+
+def unpack_bundle(path, devices_dir, prune=False):
+    from yaml_emitter import BatchWriter
+
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+    with DeviceBundle(path) as bundle:
+        records = {record['path']: record for record in bundle.records()}
+    with BatchWriter() as writer:
+        for rel_path, record in sorted(records.items()):
+            file_path = os.path.join(devices_dir, _check_path(rel_path))
+            text = record_text(record)
+            try:
+                with open(file_path, 'r') as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            # Leave files with the same content alone, however they are formatted, so an
+            # unpack into an unchanged tree writes nothing and the catalog cache stays warm
+            if current is not None and (current == text or _same_content(current, file_path, record['data'])):
+                stats['unchanged'] += 1
+                continue
+            writer.stage(file_path, text)
+            stats['written'] += 1
+
+    if prune and os.path.isdir(devices_dir):
+        for rel_path in iter_device_files(devices_dir):
+            if rel_path not in records:
+                os.remove(os.path.join(devices_dir, rel_path))
+                stats['removed'] += 1
+    return stats
+
+
+def _same_content(text, file_path, data):
+    from device_catalog import device_hash, parse_device_file
+
+    try:
+        current = parse_device_file(file_path, text)
+    except ValueError:
+        return False
+    return isinstance(current, dict) and device_hash(current) == device_hash(data)
+
+
+def bundle_stats(path):
+    with DeviceBundle(path) as bundle:
+        live = sum(RECORD.size + length for _, _, length in bundle.live_entries())
+        return {'devices': len(bundle), 'size': len(bundle._data), 'live': HEADER.size + live,
+                'indexed': bundle._count, 'unindexed': len(bundle._recent), 'torn': bundle.torn}
+
+
+def benchmark(path, devices_dir, rounds=LOOKUP_ROUNDS):
+    results = {}
+    start = time.perf_counter()
+    load_catalog(devices_dir, None)
+    results['YAML tree, no cache'] = time.perf_counter() - start
+    start = time.perf_counter()
+    catalog = load_bundle_catalog(path)
+    results['bundle, full load'] = time.perf_counter() - start
+
+    ids = [data['id'] for data in catalog.values()]
+    picks = [random.Random(0).choice(ids) for _ in range(rounds)] if ids else []
+    with DeviceBundle(path) as bundle:
+        start = time.perf_counter()
+        for device_id in picks:
+            bundle.view(device_id).release()
+        results[f"bundle, {rounds} view() lookups"] = time.perf_counter() - start
+        start = time.perf_counter()
+        for device_id in picks:
+            bundle.get(device_id)
+        results[f"bundle, {rounds} get() lookups"] = time.perf_counter() - start
+    return results
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--bundle', default=DEFAULT_BUNDLE, help='Path of the packed bundle (its index is <bundle>.idx)')
+    tree = argparse.ArgumentParser(add_help=False)
+    tree.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+
+    parser = argparse.ArgumentParser(description='Pack the device catalog into a single append-only file with an mmap-readable index')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', parents=[common, tree], help='Append new and changed devices from the YAML tree to the bundle')
+    pack.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    pack.add_argument('--rebuild', action='store_true', help='Write a fresh bundle instead of appending to the existing one')
+    pack.add_argument('--no-prune', action='store_true', help='Keep devices whose YAML file no longer exists')
+    unpack = commands.add_parser('unpack', parents=[common, tree], help='Write the YAML tree from the bundle (files packed from a tree come back as they were)')
+    unpack.add_argument('--prune', action='store_true', help='Delete device files that are not in the bundle')
+    commands.add_parser('compact', parents=[common], help='Rewrite the bundle with only the latest record of each live device')
+    get = commands.add_parser('get', parents=[common], help='Print one device')
+    get.add_argument('device', help='Device id')
+    get.add_argument('--yaml', action='store_true', help='Print the device as YAML instead of the stored JSON record')
+    stats = commands.add_parser('stats', parents=[common, tree], help='Show the size of the bundle and how much compaction would reclaim')
+    stats.add_argument('--benchmark', action='store_true', help='Also time a full load against the YAML tree, and random lookups')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'pack':
+            start = time.perf_counter()
+            result = pack_catalog(args.bundle, load_catalog(args.devices_dir, args.cache_file),
+                                  prune=not args.no_prune, rebuild=args.rebuild, devices_dir=args.devices_dir)
+            print(f"{args.bundle}: {result['inserted']} inserted, {result['updated']} updated, {result['unchanged']} unchanged, "
+                  f"{result['deleted']} deleted, {result['skipped']} skipped in {(time.perf_counter() - start) * 1000:.1f}ms")
+        elif args.command == 'unpack':
+            result = unpack_bundle(args.bundle, args.devices_dir, prune=args.prune)
+            print(f"{args.devices_dir}: {result['written']} written, {result['unchanged']} unchanged, {result['removed']} removed")
+        elif args.command == 'compact':
+            result = compact(args.bundle)
+            print(f"{args.bundle}: {result['devices']} devices, {result['before']} -> {result['after']} bytes")
+        elif args.command == 'get':
+            with DeviceBundle(args.bundle) as bundle:
+                view = bundle.view(args.device)
+                if view is None:
+                    raise ValueError(f"No device with id {args.device} in {args.bundle}")
+                with view:
+                    if args.yaml:
+                        sys.stdout.write(record_text(json.loads(str(view, 'utf-8'))))
+                    else:
+                        sys.stdout.buffer.write(view)
+                        sys.stdout.buffer.write(b'\n')
+        else:
+            result = bundle_stats(args.bundle)
+            print(f"{args.bundle}: {result['devices']} devices, {result['size']} bytes, "
+                  f"{result['size'] - result['live']} reclaimable by compact")
+            print(f"index covers {result['indexed']} devices, {result['unindexed']} records scanned on open")
+            if result['torn']:
+                print(f"Warning: {result['torn']} bytes of an interrupted write at the end", file=sys.stderr)
+            if args.benchmark:
+                for label, seconds in benchmark(args.bundle, args.devices_dir).items():
+                    print(f"{label:<32} {seconds * 1000:8.1f}ms")
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
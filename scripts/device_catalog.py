@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import pickle
+import sys
+import time
+import zlib
+
+# hashlib and json are only needed once a file has changed, so a warm --check never imports them
+
+CACHE_VERSION = 2
+DEFAULT_DEVICES_DIR = 'data/devices'
+# Caches live in the repository's .cache/ wherever the scripts are run from, one per
+# devices directory, so switching between catalogs never throws another's away
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+DEFAULT_CACHE_FILE = 'auto'
+
+
+def cache_file_for(devices_dir):
+    # A collision only costs a rebuild: read_cache checks the devices_dir stored in the file
+    digest = zlib.crc32(os.path.abspath(devices_dir).encode())
+    return os.path.join(CACHE_DIR, f"device-catalog-{digest:08x}.pickle")
+
+
+def resolve_cache_file(devices_dir, cache_file=DEFAULT_CACHE_FILE):
+    return cache_file_for(devices_dir) if cache_file == DEFAULT_CACHE_FILE else cache_file
+
+
+def iter_device_files(devices_dir):
+    for brand in sorted(os.listdir(devices_dir)):
+        brand_dir = os.path.join(devices_dir, brand)
+        if not os.path.isdir(brand_dir):
+            continue
+        for name in sorted(os.listdir(brand_dir)):
+            if name.endswith(('.yaml', '.yml')):
+                yield f"{brand}/{name}"
+
+
+def yaml_loader():
+    # PyYAML is imported on first use, so loads served from the cache never pay for it
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parse_device_file(path, content=None):
+    import yaml
+
+    if content is None:
+        with open(path, 'rb') as f:
+            content = f.read()
+    try:
+        return yaml.load(content, Loader=yaml_loader())
+    except yaml.YAMLError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+def _canonical_numbers(value):
+    # 5600 and 5600.0 are the same value; the emitter writes floats where the catalog has ints
+    if isinstance(value, dict):
+        return {key: _canonical_numbers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_canonical_numbers(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def device_hash(data):
+    # Hash of the parsed content, so formatting, key order and 5600 vs 5600.0 never count as a change
+    import hashlib
+    import json
+
+    return hashlib.sha256(json.dumps(_canonical_numbers(data), sort_keys=True, default=str).encode()).hexdigest()
+
+
+def read_cache(cache_file, devices_dir):
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    # Entries are keyed by path relative to the catalog, so another catalog's cache is never reused
+    if cache.get('devices_dir') != os.path.abspath(devices_dir):
+        return {}
+    return cache.get('entries', {})
+
+
+def write_cache(cache_file, devices_dir, entries):
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        cache = {'version': CACHE_VERSION, 'devices_dir': os.path.abspath(devices_dir), 'entries': entries}
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_file)
+
+
+def load_catalog(devices_dir=DEFAULT_DEVICES_DIR, cache_file=DEFAULT_CACHE_FILE, stats=None):
+    start = time.perf_counter()
+    cache_file = resolve_cache_file(devices_dir, cache_file)
+    cached = read_cache(cache_file, devices_dir)
+    entries = {}
+    parsed = reused = 0
+    dirty = False
+
+    for rel_path in iter_device_files(devices_dir):
+        path = os.path.join(devices_dir, rel_path)
+        st = os.stat(path)
+        entry = cached.get(rel_path)
+
+        # Unchanged mtime and size: trust the cached record without reading the file
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            entries[rel_path] = entry
+            reused += 1
+            continue
+
+        import hashlib
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        if entry and entry['sha256'] == digest:
+            entry = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            reused += 1
+        else:
+            entry = {
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha256': digest,
+                'data': parse_device_file(path, content),
+            }
+            parsed += 1
+
+        entries[rel_path] = entry
+        dirty = True
+
+    removed = len(set(cached) - set(entries))
+    if cache_file and (dirty or removed):
+        write_cache(cache_file, devices_dir, entries)
+
+    if stats is not None:
+        stats.update({
+            'devices': len(entries),
+            'parsed': parsed,
+            'reused': reused,
+            'removed': removed,
+            'seconds': time.perf_counter() - start,
+            'loader': yaml_loader().__name__ if parsed else 'cache',
+        })
+
+    return {rel_path: entry['data'] for rel_path, entry in entries.items()}
+
+
+def load_devices(devices_dir=DEFAULT_DEVICES_DIR, cache_file=DEFAULT_CACHE_FILE):
+    return [data for data in load_catalog(devices_dir, cache_file).values() if isinstance(data, dict)]
+
+
+def format_stats(label, stats):
+    return (f"{label}: {stats['devices']} devices in {stats['seconds'] * 1000:.1f}ms "
+            f"(parsed {stats['parsed']}, reused {stats['reused']}, removed {stats['removed']}, "
+            f"loader {stats['loader']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load the device catalog through the compiled cache')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--benchmark', action='store_true', help='Drop the cache and report cold and warm load times')
+    args = parser.parse_args()
+    args.cache_file = resolve_cache_file(args.devices_dir, args.cache_file)
+
+    try:
+        if args.benchmark and os.path.exists(args.cache_file):
+            os.remove(args.cache_file)
+
+        stats = {}
+        load_catalog(args.devices_dir, args.cache_file, stats)
+        print(format_stats('Cold load' if args.benchmark else 'Loaded', stats))
+
+        if args.benchmark:
+            stats = {}
+            load_catalog(args.devices_dir, args.cache_file, stats)
+            print(format_stats('Warm load', stats))
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
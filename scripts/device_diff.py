@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+
+from device_catalog import device_hash, parse_device_file
+
+MAX_VALUE_CHARS = 60
+
+
+def _join_path(path, key):
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else str(key)
+
+
+def diff_devices(old, new, path=''):
+    # Field-level changes between two device dicts, in the order the new one lists its fields
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key, value in new.items():
+            if key not in old:
+                changes.append({'path': _join_path(path, key), 'change': 'added', 'old': None, 'new': value})
+            else:
+                changes.extend(diff_devices(old[key], value, _join_path(path, key)))
+        for key, value in old.items():
+            if key not in new:
+                changes.append({'path': _join_path(path, key), 'change': 'removed', 'old': value, 'new': None})
+        return changes
+
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for i in range(max(len(old), len(new))):
+            if i >= len(old):
+                changes.append({'path': _join_path(path, i), 'change': 'added', 'old': None, 'new': new[i]})
+            elif i >= len(new):
+                changes.append({'path': _join_path(path, i), 'change': 'removed', 'old': old[i], 'new': None})
+            else:
+                changes.extend(diff_devices(old[i], new[i], _join_path(path, i)))
+        return changes
+
+    # 32 and 32.0 are the same value, but a bool is never the same as 1
+    if old == new and type(old) is type(new) or (
+            isinstance(old, (int, float)) and isinstance(new, (int, float))
+            and not isinstance(old, bool) and not isinstance(new, bool) and old == new):
+        return []
+    return [{'path': path, 'change': 'changed', 'old': old, 'new': new}]
+
+
+def _short(value):
+    text = json.dumps(value, default=str)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 3] + '...'
+
+
+def format_change(change):
+    if change['change'] == 'added':
+        return f"+ {change['path']}: {_short(change['new'])}"
+    if change['change'] == 'removed':
+        return f"- {change['path']}: {_short(change['old'])}"
+    return f"~ {change['path']}: {_short(change['old'])} -> {_short(change['new'])}"
+
+
+def compare_devices(old, new):
+    # status is 'created' when there is nothing to compare against
+    new_hash = device_hash(new)
+    if old is None:
+        return {'status': 'created', 'hash': new_hash, 'previous_hash': None, 'changes': []}
+    old_hash = device_hash(old)
+    changes = [] if old_hash == new_hash else diff_devices(old, new)
+    # The diff has the final say, so the status can never be 'updated' with nothing listed
+    return {'status': 'updated' if changes else 'unchanged', 'hash': new_hash, 'previous_hash': old_hash, 'changes': changes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the field-level differences between two device YAML files')
+    parser.add_argument('old', help='Previous device YAML file')
+    parser.add_argument('new', help='New device YAML file')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args()
+
+    try:
+        result = compare_devices(parse_device_file(args.old), parse_device_file(args.new))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    elif result['status'] == 'unchanged':
+        print('No changes')
+    else:
+        for change in result['changes']:
+            print(format_change(change))
+    # Exit codes follow diff(1): 0 identical, 1 different, 2 trouble
+    return 0 if result['status'] == 'unchanged' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
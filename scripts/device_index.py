@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import math
+import re
+import sys
+import time
+from collections import Counter
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+NGRAM_SIZE = 3
+NEAR_DUPLICATE_THRESHOLD = 0.85
+MAX_NEAR_MATCHES = 10
+# Grams probed beyond the minimum the similarity bound needs; each one raises the
+# number of hits a candidate must have, so fewer get scored
+EXTRA_PROBES = 2
+NON_ALNUM_REGEX = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_key(*values):
+    return NON_ALNUM_REGEX.sub(' ', ' '.join(str(v) for v in values if v).lower()).strip()
+
+
+def device_key(data):
+    cpu = data.get('cpu') or {}
+    return normalize_key(data.get('brand'), data.get('model'), cpu.get('model'))
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    padded = f" {text} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+def device_path(data):
+    return f"{data['brand'].lower()}/{data['id'].split('-', 1)[1]}.yaml"
+
+
+def build_device_index(catalog):
+    index = {'ids': {}, 'paths': {}, 'docs': [], 'docs_by_path': {}, 'postings': {}}
+    for rel_path, data in catalog.items():
+        if isinstance(data, dict):
+            add_device(index, data, rel_path)
+    return index
+
+
+def add_device(index, data, rel_path):
+    # A device written again to the same path replaces its earlier entry; stale
+    # postings are skipped at lookup time
+    previous = index['docs_by_path'].get(rel_path)
+    if previous is not None:
+        old_id = index['docs'][previous][0]
+        if old_id and index['ids'].get(old_id) == rel_path:
+            del index['ids'][old_id]
+        index['docs'][previous] = None
+
+    doc = len(index['docs'])
+    grams = frozenset(ngrams(device_key(data)))
+    index['docs'].append((data.get('id'), rel_path, grams))
+    index['docs_by_path'][rel_path] = doc
+    if data.get('id'):
+        index['ids'][data['id']] = rel_path
+    index['paths'][rel_path] = data.get('id')
+    for gram in grams:
+        index['postings'].setdefault(gram, []).append(doc)
+
+
+def near_candidates(index, grams, threshold):
+    # A device with Jaccard similarity >= threshold shares at least
+    # ceil(threshold * len(grams)) of the grams, so among any `probes` of them it
+    # has at least probes - (len(grams) - that). Counting hits on the rarest grams
+    # only keeps the postings walked short however common the others are
+    shared = math.ceil(threshold * len(grams) - 1e-9)
+    probes = min(len(grams), len(grams) - shared + 1 + EXTRA_PROBES)
+    needed = probes - (len(grams) - shared)
+    postings = index['postings']
+    hits = Counter()
+    for gram in sorted(grams, key=lambda gram: len(postings.get(gram, ())))[:probes]:
+        hits.update(postings.get(gram, ()))
+    return [doc for doc, count in hits.items() if count >= needed]
+
+
+def find_duplicates(index, data, threshold=NEAR_DUPLICATE_THRESHOLD):
+    matches = []
+    rel_path = device_path(data)
+    # The device's own file, as when an edited issue is processed again, is not a duplicate of it
+    own_path = rel_path if index['paths'].get(rel_path) == data['id'] else None
+
+    if data['id'] in index['ids'] and index['ids'][data['id']] != own_path:
+        matches.append({'kind': 'id', 'id': data['id'], 'path': index['ids'][data['id']], 'score': 1.0})
+    if rel_path in index['paths'] and index['paths'][rel_path] != data['id']:
+        matches.append({'kind': 'path', 'id': index['paths'][rel_path], 'path': rel_path, 'score': 1.0})
+
+    grams = frozenset(ngrams(device_key(data)))
+    candidates = near_candidates(index, grams, threshold)
+    seen = {match['path'] for match in matches}
+    seen.add(own_path)
+    min_size, max_size = threshold * len(grams) - 1e-9, len(grams) / threshold + 1e-9
+    scored = []
+    for doc in sorted(candidates):
+        entry = index['docs'][doc]
+        if entry is None or entry[1] in seen:
+            continue
+        other_id, other_path, other_grams = entry
+        # Sets of very different sizes cannot reach the threshold
+        if not min_size <= len(other_grams) <= max_size:
+            continue
+        shared = len(grams & other_grams)
+        score = shared / (len(grams) + len(other_grams) - shared)
+        if score >= threshold:
+            scored.append((score, other_path, other_id))
+
+    for score, other_path, other_id in heapq.nlargest(MAX_NEAR_MATCHES, scored, key=lambda item: item[0]):
+        matches.append({'kind': 'near', 'id': other_id, 'path': other_path, 'score': round(score, 3)})
+    return matches
+
+
+def format_duplicate(match):
+    if match['kind'] == 'near':
+        return f"a near-duplicate of {match['id']} ({match['path']}, similarity {match['score']:.2f})"
+    article = 'an' if match['kind'] == 'id' else 'a'
+    return f"{article} {match['kind']} collision with {match['id']} ({match['path']})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report exact and near-duplicate devices in the catalog')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--threshold', type=float, default=NEAR_DUPLICATE_THRESHOLD, help='Minimum n-gram similarity for near-duplicates')
+    args = parser.parse_args()
+
+    try:
+        catalog = load_catalog(args.devices_dir, args.cache_file)
+        index = build_device_index({})
+        found = 0
+        start = time.perf_counter()
+
+        # Index incrementally so every pair is reported once
+        for rel_path, data in catalog.items():
+            if not isinstance(data, dict) or not data.get('id') or not data.get('brand'):
+                continue
+            for match in find_duplicates(index, data, args.threshold):
+                print(f"{rel_path}: {format_duplicate(match)}")
+                found += 1
+            add_device(index, data, rel_path)
+
+        elapsed = time.perf_counter() - start
+        checked = len(index['docs'])
+        print(f"\nChecked {checked} devices, {found} possible duplicates "
+              f"({elapsed / max(checked, 1) * 1e6:.0f}us per device)")
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
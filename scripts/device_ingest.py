@@ -0,0 +1,1121 @@
+#!/usr/bin/env python3
+import io
+import mmap
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext
+from functools import partial
+
+# PyYAML, the sibling modules and the process pool are imported where they are
+# first needed: most runs handle one issue, so startup dominates their cost
+
+INTEL_CORE_REGEX = re.compile(r'^i[3579]-\d+')
+# Issue bodies are untrusted, so every pattern below runs in linear time: a
+# match may only start where a digit run starts, and nothing is nested.
+# Leftmost-match semantics are the same as the old lazy ".*?" chains
+OCULINK_REGEX = re.compile(r'(?<!\d)(\d+)x?\s*(OCuLink\s*\d+\.\d+)')
+POWER_WATTS_REGEX = re.compile(r'(\d+(?:\.\d+)?)W')
+POWER_VOLTS_REGEX = re.compile(r'(?<!\d)(\d+(?:\.\d+)?)[vV]')
+POWER_AMPS_REGEX = re.compile(r'(?<!\d)(\d+(?:\.\d+)?)A')
+DIGITS_REGEX = re.compile(r'\d+')
+MAX_OCULINK_PORTS = 16
+
+# Set by --profile/--metrics-json; stage hooks are no-ops while it is None
+_metrics = None
+
+
+def _stage(name):
+    return _metrics.stage(name) if _metrics else nullcontext()
+
+
+def _lap(name):
+    if _metrics:
+        _metrics.lap(name)
+
+
+def normalize_cpu_model(cpu_brand, cpu_model):
+    if not cpu_model:
+        return cpu_model
+    
+    if cpu_brand == "Intel":
+        if INTEL_CORE_REGEX.match(cpu_model) and not cpu_model.startswith("Core"):
+            return f"Core {cpu_model}"
+    
+    return cpu_model
+
+
+def parse_core_config(core_config):
+    if not core_config or core_config == 'No response':
+        return None
+    
+    types = []
+    lines = [line.strip() for line in core_config.split('\n') if line.strip()]
+    
+    for line in lines:
+        core_data = {}
+        parts = [p.strip() for p in line.split(',')]
+        
+        for part in parts:
+            if not part or ':' not in part:
+                continue
+                
+            key, value = [x.strip() for x in part.split(':', 1)]
+            key_lower = key.lower()
+            
+            if key_lower == 'type':
+                core_data['type'] = value
+            elif key_lower == 'count':
+                try:
+                    core_data['count'] = int(value)
+                except ValueError:
+                    continue
+            elif key_lower == 'boost clock':
+                try:
+                    core_data['boost_clock'] = float(value)
+                except ValueError:
+                    continue
+        
+        if 'type' in core_data and 'count' in core_data and 'boost_clock' in core_data:
+            types.append(core_data)
+    
+    return {"types": types} if types else None
+
+
+FIELD_MAPPING = {
+    'Device ID': 'id',
+    'Brand': 'brand',
+    'Model': 'model',
+    'Release Date': 'release_date',
+    'CPU Brand': 'cpu_brand',
+    'CPU Model': 'cpu_model',
+    'CPU TDP (Watts)': 'cpu_tdp',
+    'CPU Cores': 'cpu_cores',
+    'CPU Threads': 'cpu_threads',
+    'Base Clock (GHz)': 'base_clock',
+    'Boost Clock (GHz)': 'boost_clock',
+    'CPU Architecture': 'cpu_architecture',
+    'CPU Socket Type': 'cpu_socket_type',
+    'Core Configuration': 'cpu_core_config',
+    'GPU Models': 'gpu_models',
+    'Memory Type': 'memory_type',
+    'Memory Module Type': 'memory_module_type',
+    'Memory Slots': 'memory_slots',
+    'Maximum Memory Capacity (GB)': 'memory_max',
+    'Memory Speed (MT/s)': 'memory_speed',
+    'Storage Details': 'storage_details',
+    'WiFi Standard': 'wifi_standard',
+    'WiFi Chipset': 'wifi_chipset',
+    'Bluetooth Version': 'bluetooth_version',
+    'Ethernet Ports': 'ethernet_ports',
+    'PCIe Slots': 'pcie_slots',
+    'OCuLink Ports': 'oculink_ports',
+    'SIM Card Slots': 'sim_slots',
+    'mPCIe Slots': 'mpcie_slots',
+    'USB Ports': 'usb_ports',
+    'Display Ports': 'display_ports',
+    'Audio Jacks': 'audio_jacks',
+    'SD Card Reader': 'sd_card_reader',
+    'Micro SD Card Reader': 'micro_sd_card_reader',
+    'Serial Ports': 'serial_ports',
+    'IR Receiver': 'ir_receiver',
+    'Dimensions (mm)': 'dimensions',
+    'Power Adapter': 'power_adapter',
+    'Additional Information': 'additional_info'
+}
+
+# Caps, in UTF-8 bytes, on what is read from an issue body. GitHub stops issue
+# bodies at 65536 characters, so a body is rejected as soon as more than
+# MAX_BODY_BYTES of it have been read, and over-long lines and fields are cut
+# rather than buffered. Reading stops after the last form field, so anything
+# after it is neither read nor counted
+MAX_BODY_BYTES = 1024 * 1024
+MAX_LINE_BYTES = 16 * 1024
+MAX_FIELD_BYTES = 1024
+MAX_LIST_FIELD_BYTES = 16 * 1024
+# Fields holding one entry per line get more room than single values
+FIELD_BYTE_LIMITS = {field: MAX_LIST_FIELD_BYTES for field in (
+    'cpu_core_config', 'gpu_models', 'storage_details', 'ethernet_ports', 'pcie_slots', 'sim_slots',
+    'mpcie_slots', 'usb_ports', 'display_ports', 'serial_ports', 'additional_info')}
+
+
+def _mmap_readline(source, limit):
+    # mmap.readline() takes no size, so look for the newline within the limit instead
+    start = source.tell()
+    end = source.find(b'\n', start, start + limit)
+    return source.read(limit if end < 0 else end + 1 - start)
+
+
+def _utf8_size(text):
+    if isinstance(text, bytes) or text.isascii():
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
+def _cut_utf8(text, max_bytes):
+    # Same cut as reading max_bytes of the encoded text, so str and bytes sources agree
+    if _utf8_size(text) <= max_bytes:
+        return text
+    return text.encode('utf-8')[:max_bytes].decode('utf-8', errors='replace')
+
+
+def iter_issue_lines(source, max_line_bytes=MAX_LINE_BYTES, max_body_bytes=MAX_BODY_BYTES):
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    # Text sources are read in characters; max_line_bytes characters always hold max_line_bytes bytes
+    readline = partial(_mmap_readline, source) if isinstance(source, mmap.mmap) else source.readline
+
+    total = 0
+    while True:
+        line = readline(max_line_bytes)
+        if not line:
+            return
+        total += _utf8_size(line)
+        # Skip the rest of an over-long line without holding on to it
+        newline = b'\n' if isinstance(line, bytes) else '\n'
+        rest = line
+        while not rest.endswith(newline) and total <= max_body_bytes:
+            rest = readline(max_line_bytes)
+            if not rest:
+                break
+            total += _utf8_size(rest)
+        if total > max_body_bytes:
+            raise ValueError(f"Issue body is larger than {max_body_bytes} bytes")
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        else:
+            line = _cut_utf8(line, max_line_bytes)
+        yield line
+
+
+def iter_issue_fields(source, field_mapping=FIELD_MAPPING, max_field_bytes=MAX_FIELD_BYTES, field_limits=FIELD_BYTE_LIMITS, stats=None):
+    pending = set(field_mapping)
+    lines = sections = 0
+    current_field = None
+    field_name = None
+    current_value = []
+    current_size = 0
+    limit = max_field_bytes
+
+    for line in iter_issue_lines(source):
+        line = line.strip()
+        
+        if not line or line == 'Description' or line == 'Submission Confirmation':
+            continue
+        lines += 1
+
+        if line.startswith('### '):
+            if field_name and current_value:
+                yield field_name, '\n'.join(current_value).strip()
+            if current_field:
+                pending.discard(current_field)
+                if not pending:
+                    if stats is not None:
+                        stats.update(lines=lines, sections=sections)
+                    return
+            
+            current_field = line[4:]
+            field_name = field_mapping.get(current_field)
+            if field_name:
+                sections += 1
+            current_value = []
+            current_size = 0
+            limit = field_limits.get(field_name, max_field_bytes)
+            continue
+
+        if line == '_No response_':
+            continue
+
+        # Unmapped sections are never buffered and mapped ones are capped, so
+        # large pasted logs do not grow memory with the size of the body
+        if field_name and not line.startswith('- [x]') and current_size < limit:
+            line = _cut_utf8(line, limit - current_size)
+            current_value.append(line)
+            current_size += _utf8_size(line) + 1
+
+    if field_name and current_value:
+        yield field_name, '\n'.join(current_value).strip()
+
+    if stats is not None:
+        stats.update(lines=lines, sections=sections)
+
+
+def parse_issue_form(issue_body):
+    if not issue_body:
+        raise ValueError('Issue body is empty')
+
+    stats = {}
+    fields = dict(iter_issue_fields(issue_body, stats=stats))
+    # Streams and files are only known to be empty once read
+    if not fields:
+        if not stats['lines']:
+            raise ValueError('Issue body is empty')
+        if not stats['sections']:
+            raise ValueError('Issue body has no recognized sections')
+        raise ValueError('Issue body has no answered fields')
+    return fields
+
+
+def _pcie_slot_version(record, value):
+    record['version'] = value.split()[-1] if 'PCIe' in value else '3.0'
+
+
+# Declarative layout of the "Key: value, Key: value" list fields. Each spec is
+# compiled once into a key -> (target, converter, follow-up) dispatch table.
+SECTION_SPECS = {
+    'gpu': {
+        'source': 'gpu_models',
+        'prefixes': ('Type:',),
+        'fields': {'type': 'type', 'model': 'model', 'vram': 'vram'},
+    },
+    'storage': {
+        'source': 'storage_details',
+        'prefixes': ('Type:',),
+        'fields': {
+            'type': 'type',
+            'form factor': 'form_factor',
+            'interface': 'interface',
+            'alt interface': 'alt_interface',
+        },
+    },
+    'ethernet': {
+        'source': 'ethernet_ports',
+        'prefixes': ('Type:',),
+        'defaults': {'ports': 1},
+        'fields': {'type': 'speed', 'chipset': 'chipset', 'interface': 'interface'},
+    },
+    'usb': {
+        'source': 'usb_ports',
+        'prefixes': ('Type:',),
+        'fields': {
+            'type': 'type',
+            'speed': 'speed',
+            'count': ('count', int),
+            'alt mode': 'alt_mode',
+            'max resolution': 'max_resolution',
+            'thunderbolt': 'thunderbolt_version',
+        },
+    },
+    'display': {
+        'source': 'display_ports',
+        'prefixes': ('Type:',),
+        'fields': {
+            'type': 'type',
+            'count': ('count', int),
+            'version': 'version',
+            'form factor': 'form_factor',
+            'max resolution': 'max_resolution',
+        },
+    },
+    'serial': {
+        'source': 'serial_ports',
+        'prefixes': ('Count:', '- Count:'),
+        'strip_markers': True,
+        'fields': {'count': ('count', int), 'type': 'type'},
+        'required': ('count', 'type'),
+        'first_only': True,
+    },
+    'sim_slots': {
+        'source': 'sim_slots',
+        'prefixes': ('Type:', '- Type:'),
+        'strip_markers': True,
+        'fields': {'type': 'type', 'count': ('count', int)},
+        'required': ('type', 'count'),
+    },
+    'mpcie_slots': {
+        'source': 'mpcie_slots',
+        'prefixes': ('Count:', '- Count:'),
+        'strip_markers': True,
+        'fields': {'count': ('count', int), 'type': 'type', 'note': 'note'},
+        'required': ('count', 'type'),
+    },
+    'pcie_slots': {
+        'source': 'pcie_slots',
+        'prefixes': ('Type:', '- Type:'),
+        'strip_markers': True,
+        'fields': {'type': ('type', None, _pcie_slot_version), 'form factor': 'form_factor'},
+        'required': ('type',),
+    },
+}
+
+
+def compile_section_spec(spec):
+    dispatch = {}
+    for key, field in spec['fields'].items():
+        if not isinstance(field, tuple):
+            field = (field,)
+        dispatch[key] = field + (None,) * (3 - len(field))
+
+    return {
+        'source': spec['source'],
+        'prefixes': spec['prefixes'],
+        'strip_markers': spec.get('strip_markers', False),
+        'defaults': spec.get('defaults', {}),
+        'required': spec.get('required', ()),
+        'first_only': spec.get('first_only', False),
+        'dispatch': dispatch,
+    }
+
+
+COMPILED_SECTIONS = tuple((name, compile_section_spec(spec)) for name, spec in SECTION_SPECS.items())
+
+
+def parse_section(section, text, skipped=None):
+    # Malformed parts are left out (and reported through `skipped`) rather than
+    # failing the whole submission
+    prefixes = section['prefixes']
+    strip_markers = section['strip_markers']
+    defaults = section['defaults']
+    required = section['required']
+    first_only = section['first_only']
+    dispatch = section['dispatch']
+    records = []
+
+    for line in text.split('\n'):
+        if not line.lstrip().startswith(prefixes):
+            continue
+        if strip_markers:
+            line = line.replace('- ', '')
+
+        record = dict(defaults)
+        for part in line.split(','):
+            key, sep, value = part.partition(':')
+            if not sep:
+                if part.strip() and skipped is not None:
+                    skipped.append(part.strip())
+                continue
+            entry = dispatch.get(key.strip().lower())
+            if entry is not None:
+                target, convert, follow_up = entry
+                value = value.strip()
+                try:
+                    record[target] = convert(value) if convert else value
+                except ValueError:
+                    if skipped is not None:
+                        skipped.append(part.strip())
+                    continue
+                if follow_up:
+                    follow_up(record, value)
+
+        if required and not all(field in record for field in required):
+            continue
+
+        records.append(record)
+        if first_only:
+            break
+
+    return records
+
+
+def parse_sections(extracted_data):
+    sections = {}
+    for name, section in COMPILED_SECTIONS:
+        text = extracted_data.get(section['source'])
+        if not text or text == 'No response':
+            continue
+
+        skipped = []
+        records = parse_section(section, text, skipped)
+        if skipped:
+            print(f"Warning: ignored {len(skipped)} malformed value(s) in {section['source']}, "
+                  f"first: '{skipped[0][:80]}'", file=sys.stderr)
+        if records:
+            sections[name] = records
+    return sections
+
+
+def parse_oculink_ports(value):
+    # "1x OCuLink 2.0" -> one entry per port
+    match = OCULINK_REGEX.search(value)
+    if not match:
+        return None
+    count = int(match.group(1))
+    if count > MAX_OCULINK_PORTS:
+        print(f"Warning: ignoring implausible OCuLink port count {match.group(1)[:20]}", file=sys.stderr)
+        return None
+    return [{'version': match.group(2)} for _ in range(count)]
+
+
+def parse_dimensions(value):
+    parts = value.split('x', 3)
+    if len(parts) != 3:
+        return None
+    try:
+        width, depth, height = [float(part.strip()) for part in parts]
+    except ValueError:
+        return None
+    return {"width": width, "depth": depth, "height": height}
+
+
+def parse_power_adapter(value):
+    # "120W 19V 6.32A": wattage first, then the first voltage and current after it
+    watts = POWER_WATTS_REGEX.match(value)
+    volts = POWER_VOLTS_REGEX.search(value, watts.end()) if watts else None
+    amps = POWER_AMPS_REGEX.search(value, volts.end()) if volts else None
+    if amps:
+        return {"adapter_wattage": float(watts.group(1)), "dc_input": f"{volts.group(1)}V/{amps.group(1)}A"}
+
+    digits = DIGITS_REGEX.search(value)
+    if not digits:
+        return None
+    return {"adapter_wattage": float(digits.group())}
+
+
+def _cpu_value(extracted_data, field, convert, cpu_spec, spec_field, required=True):
+    known = cpu_spec.get(spec_field) if cpu_spec else None
+    if known is None:
+        if not required and not extracted_data.get(field):
+            return None
+        return convert(extracted_data[field])
+
+    raw = extracted_data.get(field)
+    if not raw or raw == 'No response':
+        return convert(known)
+    try:
+        value = convert(raw)
+    except ValueError:
+        print(f"Warning: using known {spec_field} {known} for {cpu_spec['model']} instead of '{raw}'", file=sys.stderr)
+        return convert(known)
+
+    if value != convert(known):
+        print(f"Warning: submitted {spec_field} {value} differs from known {known} for {cpu_spec['model']}", file=sys.stderr)
+    return value
+
+
+def create_device_yaml(extracted_data, cpu_index=None):
+    device_id = f"{extracted_data['brand'].lower()}-{extracted_data['id'].lower()}"
+    cpu_model = normalize_cpu_model(extracted_data['cpu_brand'], extracted_data['cpu_model'])
+    cpu_spec = None
+    
+    if cpu_index is not None:
+        from cpu_specs import lookup_cpu
+
+        # A known CPU is written with the catalog's spelling of its model, so the same
+        # chip never ends up under two names
+        cpu_spec = lookup_cpu(cpu_index, extracted_data['cpu_brand'], cpu_model)
+        if cpu_spec:
+            cpu_model = cpu_spec['model']
+    
+    structured_data = {
+        "id": device_id,
+        "brand": extracted_data['brand'],
+        "model": extracted_data['model'],
+        "release_date": extracted_data['release_date'],
+
+        "cpu": {
+            "brand": extracted_data['cpu_brand'],
+            "model": cpu_model,
+            "tdp": _cpu_value(extracted_data, 'cpu_tdp', float, cpu_spec, 'tdp', required=False),
+            "cores": _cpu_value(extracted_data, 'cpu_cores', int, cpu_spec, 'cores'),
+            "threads": _cpu_value(extracted_data, 'cpu_threads', int, cpu_spec, 'threads'),
+            "base_clock": _cpu_value(extracted_data, 'base_clock', float, cpu_spec, 'base_clock'),
+            "architecture": extracted_data['cpu_architecture']
+        }
+    }
+    
+    boost_clock = extracted_data.get('boost_clock')
+    if (boost_clock and boost_clock != 'No response') or (cpu_spec and 'boost_clock' in cpu_spec):
+        structured_data['cpu']['boost_clock'] = _cpu_value(extracted_data, 'boost_clock', float, cpu_spec, 'boost_clock')
+    
+    if 'cpu_socket_type' in extracted_data and extracted_data['cpu_socket_type'] != 'None':
+        structured_data['cpu']['socket'] = {
+            "type": extracted_data['cpu_socket_type'],
+            "supports_cpu_swap": False
+        }
+    _lap('build.cpu')
+    
+    if 'cpu_core_config' in extracted_data and extracted_data['cpu_core_config'] != 'No response':
+        core_config = parse_core_config(extracted_data['cpu_core_config'])
+        if core_config:
+            structured_data['cpu']['core_config'] = core_config
+    
+    # The known layout only fits when the submitted core count agrees with it
+    if (cpu_spec and 'core_config' in cpu_spec and 'core_config' not in structured_data['cpu']
+            and structured_data['cpu']['cores'] == cpu_spec.get('cores')):
+        structured_data['cpu']['core_config'] = cpu_spec['core_config']
+    _lap('build.core_config')
+    
+    sections = parse_sections(extracted_data)
+    _lap('build.sections')
+    
+    if 'gpu' in sections:
+        structured_data['gpu'] = sections['gpu']
+    
+    structured_data['memory'] = {
+        "slots": int(extracted_data['memory_slots']),
+        "type": extracted_data['memory_type'],
+        "speed": float(extracted_data['memory_speed']),
+        "module_type": extracted_data['memory_module_type'],
+        "max_capacity": int(extracted_data['memory_max'])
+    }
+    _lap('build.gpu_memory')
+    
+    if 'storage' in sections:
+        for storage in sections['storage']:
+            if storage.get('type') == 'SATA' and 'interface' not in storage:
+                storage['interface'] = 'SATA'
+        structured_data['storage'] = sections['storage']
+    
+    networking = {"ethernet": sections.get('ethernet', []), "wifi": {"standard": "None", "chipset": "None", "bluetooth": "None"}}
+    
+    if 'wifi_standard' in extracted_data and extracted_data['wifi_standard'] != 'No response':
+        networking['wifi']['standard'] = extracted_data['wifi_standard'].replace("Wi-Fi ", "WiFi ")
+        
+    if 'wifi_chipset' in extracted_data and extracted_data['wifi_chipset'] != 'No response':
+        networking['wifi']['chipset'] = extracted_data['wifi_chipset'] 
+        
+    if 'bluetooth_version' in extracted_data and extracted_data['bluetooth_version'] != 'No response':
+        networking['wifi']['bluetooth'] = extracted_data['bluetooth_version']
+    
+    structured_data['networking'] = networking
+    _lap('build.storage_networking')
+    
+    ports = {}
+    
+    if 'usb' in sections:
+        usb_a = []
+        usb_c = []
+        
+        for port in sections['usb']:
+            port_type = port.get('type', '').lower()
+            if 'type-c' in port_type or 'usb-c' in port_type or 'usb4' in port_type:
+                usb_c.append(port)
+            else:
+                usb_a.append(port)
+        
+        if usb_a:
+            ports['usb_a'] = usb_a
+        if usb_c:
+            ports['usb_c'] = usb_c
+    
+    if 'display' in sections:
+        hdmi_ports = []
+        dp_ports = []
+        
+        for port in sections['display']:
+            port_type = port.get('type', '').lower()
+            if 'hdmi' in port_type:
+                hdmi_ports.append(port)
+            elif 'displayport' in port_type:
+                dp_ports.append(port)
+        
+        if hdmi_ports:
+            ports['hdmi'] = hdmi_ports[0]
+        if dp_ports:
+            ports['displayport'] = dp_ports[0]
+    
+    if 'audio_jacks' in extracted_data and extracted_data['audio_jacks'] != 'None':
+        try:
+            ports['audio_jack'] = int(extracted_data['audio_jacks'])
+        except ValueError:
+            print(f"Warning: ignoring audio jack count '{extracted_data['audio_jacks'][:80]}'", file=sys.stderr)
+    
+    if 'sd_card_reader' in extracted_data and extracted_data['sd_card_reader'] != 'None':
+        ports['sd_card_reader'] = extracted_data['sd_card_reader'] == 'Yes'
+    
+    if 'micro_sd_card_reader' in extracted_data and extracted_data['micro_sd_card_reader'] != 'None':
+        ports['micro_sd_card_reader'] = extracted_data['micro_sd_card_reader'] == 'Yes'
+    
+    if 'ir_receiver' in extracted_data and extracted_data['ir_receiver'] != 'None':
+        ports['ir_receiver'] = extracted_data['ir_receiver'] == 'Yes'
+    
+    if 'serial' in sections:
+        ports['serial'] = sections['serial'][0]
+    
+    structured_data['ports'] = ports
+    _lap('build.ports')
+    
+    # Process expansion features (SIM, mPCIe and PCIe slots, OCuLink ports)
+    expansion = {}
+    
+    for name in ('sim_slots', 'mpcie_slots', 'pcie_slots'):
+        if name in sections:
+            expansion[name] = sections[name]
+    
+    if 'oculink_ports' in extracted_data and extracted_data['oculink_ports'] and extracted_data['oculink_ports'] != 'No response':
+        oculink_ports = parse_oculink_ports(extracted_data['oculink_ports'])
+        if oculink_ports is not None:
+            expansion['oculink_ports'] = oculink_ports
+    
+    if expansion:
+        structured_data['expansion'] = expansion
+    _lap('build.expansion')
+    
+    if 'dimensions' in extracted_data:
+        dimensions = parse_dimensions(extracted_data['dimensions'])
+        if dimensions:
+            structured_data['dimensions'] = dimensions
+    
+    if 'power_adapter' in extracted_data:
+        power_data = parse_power_adapter(extracted_data['power_adapter'])
+        if power_data:
+            structured_data['power'] = power_data
+        else:
+            print(f"Warning: no wattage found in power adapter '{extracted_data['power_adapter'][:80]}'", file=sys.stderr)
+    _lap('build.dimensions_power')
+    
+    return {k: v for k, v in structured_data.items() if v is not None}
+
+
+def device_file_path(data, output_directory):
+    return os.path.join(output_directory, data['brand'].lower(), f"{data['id'].split('-', 1)[1]}.yaml")
+
+
+def write_yaml_file(data, output_directory):
+    from yaml_emitter import dump_device, write_atomic
+
+    with _stage('dump'):
+        text = dump_device(data)
+    with _stage('write'):
+        return write_atomic(device_file_path(data, output_directory), text)
+
+
+def read_existing_device(file_path):
+    from device_catalog import parse_device_file
+
+    try:
+        data = parse_device_file(file_path)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"Warning: replacing unreadable {e}", file=sys.stderr)
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def compare_with_existing(data, output_directory):
+    from device_diff import compare_devices
+
+    with _stage('diff'):
+        return compare_devices(read_existing_device(device_file_path(data, output_directory)), data)
+
+
+def update_yaml_file(data, output_directory):
+    # An edit that changes nothing leaves the file, and everything downstream of it, alone
+    comparison = compare_with_existing(data, output_directory)
+    if comparison['status'] == 'unchanged':
+        return device_file_path(data, output_directory), comparison
+    return write_yaml_file(data, output_directory), comparison
+
+
+_device_indexes = {}
+_cpu_indexes = {}
+_similarity_indexes = {}
+
+
+def get_device_index(output_directory):
+    if output_directory not in _device_indexes:
+        from device_catalog import load_catalog
+        from device_index import build_device_index
+
+        _device_indexes[output_directory] = build_device_index(load_catalog(output_directory))
+    return _device_indexes[output_directory]
+
+
+def get_cpu_index(output_directory):
+    if output_directory not in _cpu_indexes:
+        from cpu_specs import build_cpu_index
+        from device_catalog import load_devices
+
+        devices = load_devices(output_directory) if os.path.isdir(output_directory) else []
+        _cpu_indexes[output_directory] = build_cpu_index(devices)
+    return _cpu_indexes[output_directory]
+
+
+def get_similarity_index(output_directory):
+    if output_directory not in _similarity_indexes:
+        from device_catalog import load_catalog
+        from device_similar import build_similarity_index
+
+        _similarity_indexes[output_directory] = build_similarity_index(load_catalog(output_directory))
+    return _similarity_indexes[output_directory]
+
+
+def index_written_device(data, output_directory):
+    # Keeps the indexes of a long-running process in step with the files it writes:
+    # the duplicate index takes the device in place, the others are rebuilt on next use
+    if output_directory in _device_indexes:
+        from device_index import add_device
+
+        rel_path = os.path.relpath(device_file_path(data, output_directory), output_directory)
+        add_device(_device_indexes[output_directory], data, rel_path)
+    _cpu_indexes.pop(output_directory, None)
+    _similarity_indexes.pop(output_directory, None)
+
+
+def print_similar(data, output_directory, k):
+    # NumPy is only needed for this, so a missing install is not fatal
+    try:
+        from device_similar import find_similar, format_match
+    except ImportError as e:
+        print(f"Warning: cannot list similar devices: {e}", file=sys.stderr)
+        return []
+    if not os.path.isdir(output_directory):
+        return []
+
+    with _stage('similar'):
+        matches = find_similar(get_similarity_index(output_directory), data, k)
+    print(f"Closest existing devices to {data['id']}:")
+    for match in matches:
+        print(f"  {format_match(match)}")
+    return matches
+
+
+def check_duplicates(data, output_directory, on_duplicate='warn'):
+    if on_duplicate == 'ignore' or not os.path.isdir(output_directory):
+        return []
+
+    from device_index import find_duplicates
+
+    return report_duplicates(data, find_duplicates(get_device_index(output_directory), data), on_duplicate)
+
+
+def report_duplicates(data, matches, on_duplicate='warn'):
+    from device_index import format_duplicate
+
+    if matches and on_duplicate == 'error':
+        raise ValueError(f"Refusing to write {data['id']}: " + '; '.join(format_duplicate(m) for m in matches))
+    for match in matches:
+        print(f"Warning: {data['id']} is {format_duplicate(match)}", file=sys.stderr)
+    return matches
+
+
+def check_validation(data, output_directory, on_invalid='warn'):
+    if on_invalid == 'ignore':
+        return []
+
+    from device_validation import validate_device
+
+    errors = validate_device(data, device_file_path(data, output_directory))
+    critical = [error for error in errors if error['critical']]
+    if critical and on_invalid == 'error':
+        raise ValueError(f"Refusing to write {data['id']}: " + '; '.join(f"{e['path']}: {e['message']}" for e in critical))
+    for error in errors:
+        level = 'Error' if error['critical'] else 'Warning'
+        print(f"{level}: {data['id']} {error['path']}: {error['message']}", file=sys.stderr)
+    return errors
+
+
+def build_device(issue_body, output_directory, on_duplicate='warn', on_invalid='warn', fill_cpu=False):
+    with _stage('parse'):
+        extracted_data = parse_issue_form(issue_body)
+    with _stage('cpu_index'):
+        cpu_index = get_cpu_index(output_directory) if fill_cpu else None
+    with _stage('build'):
+        structured_data = create_device_yaml(extracted_data, cpu_index)
+    with _stage('validate'):
+        check_validation(structured_data, output_directory, on_invalid)
+    with _stage('duplicates'):
+        check_duplicates(structured_data, output_directory, on_duplicate)
+    return structured_data
+
+
+def process_issue_body(issue_body, output_directory, **options):
+    return update_yaml_file(build_device(issue_body, output_directory, **options), output_directory)[0]
+
+
+def export_sqlite(database, devices, output_directory):
+    from device_sqlite import export_devices
+
+    with _stage('sqlite'):
+        items = [(os.path.relpath(device_file_path(data, output_directory), output_directory), data) for data in devices]
+        return export_devices(database, items)
+
+
+def export_bundle(bundle, devices, output_directory):
+    from device_bundle import update_devices
+
+    with _stage('bundle'):
+        items = [(os.path.relpath(device_file_path(data, output_directory), output_directory), data) for data in devices]
+        return update_devices(bundle, items)
+
+
+def iter_bulk_items(source):
+    import glob
+    import json
+
+    # A bad line or file is handed on as an exception in place of the body, so it is
+    # reported with the other failures instead of stopping the whole run
+    if source == '-' or source.endswith('.jsonl'):
+        stream = sys.stdin.buffer if source == '-' else open(source, 'rb')
+        try:
+            for line_number, line in enumerate(stream, 1):
+                label = f"line {line_number}"
+                try:
+                    line = line.decode('utf-8').strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                except UnicodeDecodeError as e:
+                    yield label, ValueError(f"{source} line {line_number} is not valid UTF-8: {e}")
+                    continue
+                except ValueError as e:
+                    yield label, ValueError(f"{source} line {line_number} is not valid JSON: {e}")
+                    continue
+                if isinstance(record, str):
+                    yield label, record
+                elif isinstance(record, dict):
+                    yield f"#{record['number']}" if 'number' in record else label, record.get('body') or ''
+                else:
+                    yield label, ValueError(f"{source} line {line_number} is a JSON {type(record).__name__}, not an issue or issue body")
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        return
+
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in sorted(os.listdir(source))]
+        paths = [path for path in paths if os.path.isfile(path)]
+    else:
+        paths = sorted(glob.glob(source))
+
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            body = ValueError(f"cannot read {path}: {e}")
+        yield path, body
+
+
+def _process_bulk_item(item, output_directory, trace_memory=None, **options):
+    global _metrics
+    from yaml_emitter import dump_device
+
+    label, issue_body = item
+    previous = _metrics
+    # Each item gets its own recorder so pool workers can hand their stages back;
+    # tracing is started once per worker by _init_bulk_worker, never per item
+    if trace_memory is not None:
+        from ingest_metrics import StageMetrics
+
+        _metrics = StageMetrics(trace_memory=trace_memory)
+    try:
+        if isinstance(issue_body, Exception):
+            raise issue_body
+        data = build_device(issue_body, output_directory, **options)
+        comparison = compare_with_existing(data, output_directory)
+        text = None
+        if comparison['status'] != 'unchanged':
+            with _stage('dump'):
+                text = dump_device(data)
+        result = label, device_file_path(data, output_directory), text, None, dict(comparison, id=data['id']), data
+    except Exception as e:
+        result = label, None, None, f"{type(e).__name__}: {e}", None, None
+    finally:
+        stages = _metrics.stages if trace_memory is not None else None
+        _metrics = previous
+    return result + (stages,)
+
+
+def _check_batch_item(batch, label, data, file_path, output_directory, on_duplicate):
+    # Workers only see the catalog, never the other items of the batch, so those are checked here
+    from device_index import add_device, find_duplicates
+
+    if file_path in batch['labels']:
+        raise ValueError(f"Refusing to write {data['id']}: {file_path} is also written by {batch['labels'][file_path]}")
+    if on_duplicate != 'ignore':
+        report_duplicates(data, find_duplicates(batch['index'], data), on_duplicate)
+    batch['labels'][file_path] = label
+    add_device(batch['index'], data, os.path.relpath(file_path, output_directory))
+
+
+def _init_bulk_worker(trace_memory):
+    if trace_memory is not None:
+        from ingest_metrics import StageMetrics
+
+        StageMetrics(trace_memory=trace_memory).start()
+
+
+def process_bulk(source, output_directory, workers=None, chunksize=8, **options):
+    items = list(iter_bulk_items(source))
+    emitted = []
+    results = []
+    start = time.perf_counter()
+    trace_memory = _metrics.trace_memory if _metrics else None
+
+    if workers == 1:
+        # In-process items record straight into the run's recorder, so its peak is never reset under it
+        process_item = partial(_process_bulk_item, output_directory=output_directory, **options)
+        emitted = [process_item(item) for item in items]
+    elif items:
+        from concurrent.futures import ProcessPoolExecutor
+
+        process_item = partial(_process_bulk_item, output_directory=output_directory, trace_memory=trace_memory, **options)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker, initargs=(trace_memory,)) as executor:
+            emitted = list(executor.map(process_item, items, chunksize=chunksize))
+
+    from device_index import build_device_index
+    from yaml_emitter import BatchWriter
+
+    batch = {'index': build_device_index({}), 'labels': {}}
+    on_duplicate = options.get('on_duplicate', 'warn')
+
+    # Workers only emit; files are staged here and renamed into place together
+    with _stage('write'), BatchWriter() as writer:
+        for label, file_path, text, error, comparison, data, stages in emitted:
+            if stages:
+                _metrics.merge(stages)
+            if not error:
+                try:
+                    _check_batch_item(batch, label, data, file_path, output_directory, on_duplicate)
+                except ValueError as e:
+                    file_path, text, error, comparison = None, None, f"{type(e).__name__}: {e}", None
+            if text is not None:
+                writer.stage(file_path, text)
+            results.append((label, file_path, error, comparison))
+
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def print_bulk_summary(results, elapsed):
+    failures = [result for result in results if result[2]]
+    unchanged = 0
+
+    for label, file_path, error, comparison in results:
+        if error:
+            print(f"FAIL {label}: {error}")
+        elif comparison['status'] == 'unchanged':
+            unchanged += 1
+            print(f"OK   {label}: {file_path} (unchanged, not written)")
+        elif comparison['status'] == 'updated':
+            print(f"OK   {label}: {file_path} ({len(comparison['changes'])} field(s) changed)")
+        else:
+            print(f"OK   {label}: {file_path}")
+
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"\nProcessed {len(results)} issue bodies: {len(results) - len(failures)} succeeded "
+          f"({unchanged} unchanged), {len(failures)} failed in {elapsed:.2f}s ({rate:.1f} items/s)")
+
+
+def print_changes(file_path, comparison):
+    from device_diff import format_change
+
+    if comparison['status'] == 'unchanged':
+        print(f"No changes to {file_path}; skipped writing it")
+        return
+    if comparison['status'] == 'created':
+        print(f"Successfully created YAML file: {file_path}")
+        return
+    print(f"Successfully updated YAML file: {file_path} ({len(comparison['changes'])} field(s) changed)")
+    for change in comparison['changes']:
+        print(f"  {format_change(change)}")
+
+
+def write_changes(path, changes):
+    import json
+
+    with open(path, 'w') as f:
+        json.dump(changes, f, indent=2, default=str)
+        f.write('\n')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Process GitHub issue form into a device YAML file')
+    parser.add_argument('input_file', help='Input file containing the issue body (with --bulk: a directory, glob, JSONL file or - for JSONL on stdin)')
+    parser.add_argument('--output-dir', default='data/devices', help='Output directory for the YAML file')
+    parser.add_argument('--bulk', action='store_true', help='Process many issue bodies in a process pool')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes for --bulk (default: CPU count)')
+    parser.add_argument('--on-duplicate', choices=['warn', 'error', 'ignore'], default='warn', help='What to do when the device collides with or closely matches an existing one')
+    parser.add_argument('--fill-cpu', action='store_true', help="Match the CPU against CPUs already in the catalog: use the catalog's spelling of its model and fill in or cross-check its specs")
+    parser.add_argument('--on-invalid', choices=['warn', 'error', 'ignore'], default='warn', help='What to do when the device fails the data validation rules')
+    parser.add_argument('--profile', action='store_true', help='Trace allocations and profile every stage, printing a summary to stderr')
+    parser.add_argument('--metrics-json', help='Write per-stage wall time (and allocations with --profile) to this file; a .jsonl file gets one line appended per run')
+    parser.add_argument('--sqlite', metavar='DATABASE', help='Also upsert the written devices into this SQLite database (see device_sqlite.py)')
+    parser.add_argument('--bundle', help='Also append the written devices to this packed catalog bundle (see device_bundle.py)')
+    parser.add_argument('--changes-json', help='Write whether the device was created, updated or unchanged, and which fields changed, to this file')
+    parser.add_argument('--similar', type=int, default=0, metavar='K', help='Print the K existing devices with the closest specs (needs NumPy)')
+    parser.add_argument('--check', action='store_true', help='Parse, build and validate the device without writing it (never loads the YAML emitter)')
+    args = parser.parse_args()
+    if args.check and args.bulk:
+        parser.error('--check cannot be combined with --bulk')
+    
+    global _metrics
+    if args.profile or args.metrics_json:
+        from ingest_metrics import StageMetrics
+
+        _metrics = StageMetrics(trace_memory=args.profile, profile=args.profile)
+        _metrics.start()
+
+    start = time.perf_counter()
+    status, error = run(args)
+
+    if _metrics:
+        from ingest_metrics import format_stages, write_metrics
+
+        _metrics.stop()
+        mode = 'bulk' if args.bulk else 'check' if args.check else 'single'
+        metrics = _metrics.to_dict(status='ok' if status == 0 else 'error', error=error, mode=mode,
+                                   input=args.input_file, total_seconds=round(time.perf_counter() - start, 6))
+        if args.profile:
+            print(format_stages(metrics), file=sys.stderr)
+        if args.metrics_json:
+            try:
+                write_metrics(args.metrics_json, metrics)
+            except OSError as e:
+                print(f"Warning: could not write metrics to {args.metrics_json}: {e}", file=sys.stderr)
+    return status
+
+
+def run(args):
+    options = {'on_duplicate': args.on_duplicate, 'on_invalid': args.on_invalid, 'fill_cpu': args.fill_cpu}
+
+    if args.bulk:
+        try:
+            results, elapsed = process_bulk(args.input_file, args.output_dir, workers=args.workers, **options)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1, f"{type(e).__name__}: {e}"
+
+        print_bulk_summary(results, elapsed)
+        try:
+            if args.changes_json:
+                write_changes(args.changes_json, [dict(comparison, label=label, file=file_path)
+                                                  for label, file_path, error, comparison in results if not error])
+            if args.sqlite or args.bundle:
+                from device_catalog import parse_device_file
+
+                written = [parse_device_file(file_path) for _, file_path, error, _ in results if not error]
+                if args.sqlite:
+                    export_sqlite(args.sqlite, written, args.output_dir)
+                if args.bundle:
+                    export_bundle(args.bundle, written, args.output_dir)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1, f"{type(e).__name__}: {e}"
+        failed = sum(1 for result in results if result[2])
+        return (1, f"{failed} of {len(results)} issue bodies failed") if failed else (0, None)
+
+    try:
+        with open(args.input_file, 'r') as f:
+            data = build_device(f, args.output_dir, **options)
+        if args.similar > 0:
+            print_similar(data, args.output_dir, args.similar)
+        if args.check:
+            print(f"Check passed: {data['id']} would be written to {device_file_path(data, args.output_dir)}")
+            return 0, None
+        file_path, comparison = update_yaml_file(data, args.output_dir)
+        
+        print_changes(file_path, comparison)
+        if args.changes_json:
+            write_changes(args.changes_json, dict(comparison, id=data['id'], file=file_path))
+        if args.sqlite:
+            status = export_sqlite(args.sqlite, [data], args.output_dir)[0]
+            print(f"Device {status} in {args.sqlite}")
+        if args.bundle:
+            status = export_bundle(args.bundle, [data], args.output_dir)[0]
+            print(f"Device {status} in {args.bundle}")
+        return 0, None
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1, f"{type(e).__name__}: {e}"
+
+
+if __name__ == "__main__":
+    sys.exit(main()) 
\ No newline at end of file
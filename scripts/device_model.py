@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+# Strings up to this length are enum-like ("DDR5", "M.2", "RJ45", brand names)
+# and shared between records; longer ones such as notes are kept as they are
+MAX_INTERN_CHARS = 64
+
+_key_orders = {}
+
+
+def intern_value(value):
+    if type(value) is str and len(value) <= MAX_INTERN_CHARS:
+        return sys.intern(value)
+    return value
+
+
+def intern_keys(keys):
+    return _key_orders.setdefault(keys, keys)
+
+
+class Model:
+    # Known fields live in slots named after their YAML keys; anything else goes to
+    # _extra, and _keys (shared between records of the same shape) keeps the key
+    # order, so to_dict() reproduces the original mapping exactly
+    __slots__ = ('_keys', '_extra')
+    FIELDS = ()
+    NESTED = {}
+    LISTS = {}
+
+    def __getattr__(self, name):
+        # Only reached for slots the source mapping did not have
+        if name in type(self).FIELDS:
+            return None
+        raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls.__new__(cls)
+        extra = None
+        fields = cls.FIELDS
+        for key, value in data.items():
+            if key in cls.NESTED and isinstance(value, dict):
+                value = cls.NESTED[key].from_dict(value)
+            elif key in cls.LISTS and isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                value = [cls.LISTS[key].from_dict(item) for item in value]
+            else:
+                value = intern_value(value)
+            if key in fields:
+                setattr(model, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[intern_value(key)] = value
+        model._keys = intern_keys(tuple(data))
+        model._extra = extra
+        return model
+
+    def to_dict(self):
+        data = {}
+        extra = self._extra
+        for key in self._keys:
+            value = extra[key] if extra is not None and key in extra else getattr(self, key)
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list) and value and isinstance(value[0], Model):
+                value = [item.to_dict() for item in value]
+            data[key] = value
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class CoreType(Model):
+    FIELDS = ('type', 'count', 'boost_clock')
+    __slots__ = FIELDS
+
+
+class CoreConfig(Model):
+    FIELDS = ('types',)
+    __slots__ = FIELDS
+    LISTS = {'types': CoreType}
+
+
+class Socket(Model):
+    FIELDS = ('type', 'supports_cpu_swap')
+    __slots__ = FIELDS
+
+
+class CPU(Model):
+    FIELDS = ('brand', 'model', 'cores', 'threads', 'base_clock', 'boost_clock', 'tdp', 'architecture', 'socket', 'core_config')
+    __slots__ = FIELDS
+    NESTED = {'socket': Socket, 'core_config': CoreConfig}
+
+
+class Memory(Model):
+    FIELDS = ('type', 'module_type', 'slots', 'speed', 'max_capacity')
+    __slots__ = FIELDS
+
+
+class Storage(Model):
+    FIELDS = ('type', 'form_factor', 'interface', 'alt_interface', 'capacity')
+    __slots__ = FIELDS
+
+
+class GPU(Model):
+    FIELDS = ('type', 'model', 'vram')
+    __slots__ = FIELDS
+
+
+class Ethernet(Model):
+    FIELDS = ('ports', 'speed', 'chipset', 'interface', 'note')
+    __slots__ = FIELDS
+
+
+class Wifi(Model):
+    FIELDS = ('chipset', 'standard', 'bluetooth')
+    __slots__ = FIELDS
+
+
+class Networking(Model):
+    FIELDS = ('ethernet', 'wifi')
+    __slots__ = FIELDS
+    NESTED = {'wifi': Wifi}
+    LISTS = {'ethernet': Ethernet}
+
+
+class UsbPort(Model):
+    FIELDS = ('type', 'speed', 'count', 'features', 'alt_mode', 'max_resolution', 'thunderbolt_version', 'thunderbolt_compatible', 'note')
+    __slots__ = FIELDS
+
+
+class DisplayPort(Model):
+    # Any video output block: hdmi, displayport and vga share this shape
+    FIELDS = ('count', 'version', 'type', 'form_factor', 'max_resolution', 'note')
+    __slots__ = FIELDS
+
+
+class SerialPort(Model):
+    FIELDS = ('count', 'type')
+    __slots__ = FIELDS
+
+
+class Ports(Model):
+    FIELDS = ('usb_a', 'usb_c', 'usb4', 'usb_micro', 'hdmi', 'displayport', 'vga', 'audio_jack', 'oculink',
+              'serial', 'sd_card_reader', 'micro_sd_card_reader', 'ir_receiver')
+    __slots__ = FIELDS
+    NESTED = {'hdmi': DisplayPort, 'displayport': DisplayPort, 'vga': DisplayPort, 'serial': SerialPort}
+    LISTS = {'usb_a': UsbPort, 'usb_c': UsbPort, 'usb4': UsbPort, 'usb_micro': UsbPort}
+
+
+class ExpansionSlot(Model):
+    FIELDS = ('type', 'version', 'form_factor', 'count', 'note', 'additional_info', 'full_height', 'length')
+    __slots__ = FIELDS
+
+
+class Expansion(Model):
+    FIELDS = ('pcie_slots', 'mpcie_slots', 'sim_slots', 'oculink_ports', 'egpu_support')
+    __slots__ = FIELDS
+    LISTS = {'pcie_slots': ExpansionSlot, 'mpcie_slots': ExpansionSlot, 'sim_slots': ExpansionSlot, 'oculink_ports': ExpansionSlot}
+
+
+class Dimensions(Model):
+    FIELDS = ('width', 'depth', 'height', 'weight', 'volume')
+    __slots__ = FIELDS
+
+
+class Power(Model):
+    FIELDS = ('adapter_wattage', 'dc_input', 'usb_pd_input')
+    __slots__ = FIELDS
+
+
+class Device(Model):
+    FIELDS = ('id', 'brand', 'model', 'release_date', 'cpu', 'memory', 'storage', 'gpu', 'networking', 'ports',
+              'expansion', 'dimensions', 'power', 'notes')
+    __slots__ = FIELDS
+    NESTED = {'cpu': CPU, 'memory': Memory, 'networking': Networking, 'ports': Ports, 'expansion': Expansion,
+              'dimensions': Dimensions, 'power': Power}
+    LISTS = {'storage': Storage, 'gpu': GPU}
+
+
+def synthetic_devices(devices, count, seed=0):
+    # Fresh objects per record, as if each had been parsed from its own file
+    rng = random.Random(seed)
+    texts = [json.dumps(data) for data in devices]
+    for i in range(count):
+        data = json.loads(texts[i % len(texts)])
+        data['id'] = f"{data.get('id')}-{i}"
+        data['model'] = f"{data.get('model')} {i}"
+        if isinstance(data.get('memory'), dict):
+            data['memory']['speed'] = rng.choice([3200, 4800, 5600, 6400])
+        yield data
+
+
+def measure(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def benchmark(devices, count):
+    sources = list(synthetic_devices(devices, count))
+    texts = [json.dumps(data) for data in sources]
+    del sources
+
+    dicts, dict_bytes = measure(lambda: [json.loads(text) for text in texts])
+    models, model_bytes = measure(lambda: [Device.from_dict(json.loads(text)) for text in texts])
+
+    # Timed outside tracemalloc, which would dominate both
+    start = time.perf_counter()
+    models = [Device.from_dict(data) for data in dicts]
+    from_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = [model.to_dict() for model in models]
+    to_seconds = time.perf_counter() - start
+
+    return {
+        'devices': count,
+        'dict_bytes': dict_bytes / count,
+        'model_bytes': model_bytes / count,
+        'from_dict_seconds': from_seconds / count,
+        'to_dict_seconds': to_seconds / count,
+        'mismatched': sum(data != original for data, original in zip(restored, dicts)),
+    }
+
+
+def check_round_trip(catalog):
+    from yaml_emitter import dump_device
+
+    failures = []
+    for path, data in catalog.items():
+        if not isinstance(data, dict):
+            continue
+        restored = Device.from_dict(data).to_dict()
+        if restored != data or dump_device(restored) != dump_device(data):
+            failures.append(path)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the slotted device model round-trips the catalog and measure its memory use')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--benchmark', type=int, metavar='DEVICES', help='Also compare memory per device for this many synthetic devices as dicts and as models')
+    args = parser.parse_args()
+
+    try:
+        catalog = load_catalog(args.devices_dir, args.cache_file)
+        failures = check_round_trip(catalog)
+        for path in failures:
+            print(f"Error: {path} does not round-trip through the model", file=sys.stderr)
+        print(f"{len(catalog) - len(failures)} of {len(catalog)} devices round-trip to identical YAML")
+
+        if args.benchmark:
+            result = benchmark([data for data in catalog.values() if isinstance(data, dict)], args.benchmark)
+            saved = 1 - result['model_bytes'] / result['dict_bytes']
+            print(f"\n{result['devices']} synthetic devices")
+            print(f"{'dicts':<8} {result['dict_bytes']:8.0f} bytes per device")
+            print(f"{'models':<8} {result['model_bytes']:8.0f} bytes per device ({saved:.0%} smaller)")
+            print(f"from_dict {result['from_dict_seconds'] * 1e6:.1f}us, to_dict {result['to_dict_seconds'] * 1e6:.1f}us per device")
+            print(f"{result['mismatched']} failed to round-trip")
+            if result['mismatched']:
+                return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+# Short names for the attributes people filter on most
+ALIASES = {
+    'ethernet': 'networking.ethernet.speed',
+    'wifi': 'networking.wifi.standard',
+    'oculink': 'expansion.oculink_ports',
+    'pcie': 'expansion.pcie_slots',
+    'usb_a': 'ports.usb_a',
+    'usb_c': 'ports.usb_c',
+    'thunderbolt': 'ports.usb_c.thunderbolt_version',
+    'hdmi': 'ports.hdmi',
+    'displayport': 'ports.displayport',
+    'cores': 'cpu.cores',
+    'threads': 'cpu.threads',
+    'tdp': 'cpu.tdp',
+    'ram': 'memory.max_capacity',
+}
+# Placeholder strings the data uses for "not present"
+MISSING_VALUES = {'', 'none', 'n/a', 'no response'}
+# List entries that stand for more than one physical port or slot
+MULTIPLICITY_FIELDS = ('ports', 'count')
+# Values on fewer than 1/64th of the devices keep a doc list instead of a dense bitmap
+SPARSE_RATIO = 64
+
+TOKEN_REGEX = re.compile(r'''\s*(?:
+    (?P<count>count\(\s*(?P<count_field>[\w.]+)\s*(?:=\s*(?P<count_value>"[^"]*"|[^\s()]+)\s*)?\)
+        \s*(?P<count_op>>=|<=|!=|=|>|<)\s*(?P<count_number>\d+))
+  | (?P<term>(?P<field>[\w.]+)\s*(?P<op>>=|<=|!=|=|>|<)\s*(?P<value>"[^"]*"|[^\s()]+))
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<word>[\w.]+)
+)''', re.VERBOSE | re.IGNORECASE)
+
+
+def normalize_value(value):
+    return str(value).strip().strip('"').lower()
+
+
+def bitmap_from(docs, size):
+    buf = bytearray((size + 7) // 8)
+    for doc in docs:
+        buf[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def posting(docs, size):
+    return bitmap_from(docs, size) if len(docs) * SPARSE_RATIO >= size else tuple(sorted(docs))
+
+
+def as_bitmap(entry, size):
+    return entry if isinstance(entry, int) else bitmap_from(entry, size)
+
+
+def iter_bits(bitmap):
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (offset << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+def _multiplicity(item):
+    for field in MULTIPLICITY_FIELDS:
+        if isinstance(item.get(field), int) and not isinstance(item.get(field), bool):
+            return item[field]
+    return 1
+
+
+def _index_value(builder, doc, path, value):
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        builder['numbers'].setdefault(path, []).append((float(value), doc))
+        builder['exists'].setdefault(path, set()).add(doc)
+        return
+
+    value = normalize_value(value)
+    builder['values'].setdefault(path, {}).setdefault(value, set()).add(doc)
+    if value not in MISSING_VALUES:
+        builder['exists'].setdefault(path, set()).add(doc)
+
+
+def _index_node(builder, doc, path, node):
+    if isinstance(node, dict):
+        if node and path:
+            builder['exists'].setdefault(path, set()).add(doc)
+        for key, value in node.items():
+            _index_node(builder, doc, f"{path}.{key}" if path else key, value)
+    elif isinstance(node, list):
+        if node:
+            builder['exists'].setdefault(path, set()).add(doc)
+        items = [item for item in node if isinstance(item, dict)]
+        if items:
+            builder['lists'].add(path)
+            counts = builder['counts']
+            total = counts.setdefault((path, None), {})
+            total[doc] = total.get(doc, 0) + sum(_multiplicity(item) for item in items)
+            for item in items:
+                for key, value in item.items():
+                    if isinstance(value, str):
+                        per_value = counts.setdefault((f"{path}.{key}", normalize_value(value)), {})
+                        per_value[doc] = per_value.get(doc, 0) + _multiplicity(item)
+        for item in node:
+            _index_node(builder, doc, path, item)
+    elif node is not None:
+        _index_value(builder, doc, path, node)
+
+
+def build_range(pairs, size):
+    # Range-encoded bitmaps: for each distinct value, the devices with a value
+    # equal to, at most and at least it, so any comparison is one bisect away
+    by_value = {}
+    for value, doc in pairs:
+        by_value.setdefault(value, []).append(doc)
+    values = sorted(by_value)
+    eq = [bitmap_from(by_value[value], size) for value in values]
+
+    le = []
+    seen = 0
+    for bitmap in eq:
+        seen |= bitmap
+        le.append(seen)
+    ge = [0] * len(eq)
+    seen = 0
+    for position in range(len(eq) - 1, -1, -1):
+        seen |= eq[position]
+        ge[position] = seen
+
+    return {'values': values, 'eq': eq, 'le': le, 'ge': ge, 'any': seen}
+
+
+def build_query_index(catalog):
+    paths = sorted(rel_path for rel_path, data in catalog.items() if isinstance(data, dict))
+    builder = {'values': {}, 'numbers': {}, 'exists': {}, 'counts': {}, 'lists': set()}
+    for doc, rel_path in enumerate(paths):
+        _index_node(builder, doc, '', catalog[rel_path])
+
+    size = len(paths)
+    return {
+        'paths': paths,
+        'ids': [catalog[rel_path].get('id') for rel_path in paths],
+        'records': [catalog[rel_path] for rel_path in paths],
+        'all': (1 << size) - 1,
+        'values': {path: {value: posting(docs, size) for value, docs in values.items()}
+                   for path, values in builder['values'].items()},
+        'numbers': {path: build_range(pairs, size) for path, pairs in builder['numbers'].items()},
+        'exists': {path: bitmap_from(docs, size) for path, docs in builder['exists'].items()},
+        'counts': {key: build_range([(count, doc) for doc, count in counts.items()], size)
+                   for key, counts in builder['counts'].items()},
+        'lists': builder['lists'],
+        'queries': {},
+    }
+
+
+def resolve_field(index, field):
+    path = ALIASES.get(field.lower(), field)
+    if path in index['exists'] or path in index['values'] or path in index['numbers'] or path in index['lists']:
+        return path
+    raise ValueError(f"Unknown field '{field}'; run with --fields to list them")
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_REGEX.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Cannot parse query at '{text[position:].strip()}'")
+        position = match.end()
+
+        if match.group('count'):
+            value = match.group('count_value')
+            tokens.append(('count', match.group('count_field'), normalize_value(value) if value else None,
+                           match.group('count_op'), int(match.group('count_number'))))
+        elif match.group('term'):
+            tokens.append(('term', match.group('field'), match.group('op'), match.group('value').strip('"')))
+        elif match.group('lparen'):
+            tokens.append(('(',))
+        elif match.group('rparen'):
+            tokens.append((')',))
+        elif match.group('word').upper() in ('AND', 'OR', 'NOT'):
+            tokens.append((match.group('word').upper(),))
+        else:
+            tokens.append(('exists', match.group('word')))
+    return tokens
+
+
+def parse_query(text):
+    tokens = tokenize(text)
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    # query := and_expr (OR and_expr)* ; and_expr := unary (AND? unary)* ; adjacent terms AND together
+    def parse_or():
+        node = parse_and()
+        while peek() == 'OR':
+            take()
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_unary()
+        while peek() not in (None, 'OR', ')'):
+            if peek() == 'AND':
+                take()
+            node = ('and', node, parse_unary())
+        return node
+
+    def parse_unary():
+        kind = peek()
+        if kind == 'NOT':
+            take()
+            return ('not', parse_unary())
+        if kind == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise ValueError('Missing closing parenthesis')
+            take()
+            return node
+        if kind in ('term', 'count', 'exists'):
+            return take()
+        raise ValueError(f"Expected a filter but got {'end of query' if kind is None else repr(kind)}")
+
+    if not tokens:
+        raise ValueError('Query is empty')
+    node = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Unexpected {tokens[position][0]!r} in query")
+    return node
+
+
+def select_range(ranges, op, number):
+    values = ranges['values']
+    if op in ('>=', '>'):
+        position = bisect_left(values, number) if op == '>=' else bisect_right(values, number)
+        return ranges['ge'][position] if position < len(values) else 0
+    if op in ('<=', '<'):
+        position = (bisect_right(values, number) if op == '<=' else bisect_left(values, number)) - 1
+        return ranges['le'][position] if position >= 0 else 0
+
+    position = bisect_left(values, number)
+    bitmap = ranges['eq'][position] if position < len(values) and values[position] == number else 0
+    return ranges['any'] & ~bitmap if op == '!=' else bitmap
+
+
+def _compare(index, field, op, value):
+    path = resolve_field(index, field)
+
+    if path in index['numbers']:
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"'{field}' is numeric but got '{value}'")
+        if op == '!=':
+            return index['all'] & ~select_range(index['numbers'][path], '=', number)
+        return select_range(index['numbers'][path], op, number)
+
+    if op not in ('=', '!='):
+        raise ValueError(f"'{field}' is not numeric, so only = and != apply")
+    by_value = index['values'].get(path, {})
+    bitmap = 0
+    for option in value.split('|'):
+        bitmap |= as_bitmap(by_value.get(normalize_value(option), 0), len(index['paths']))
+    return index['all'] & ~bitmap if op == '!=' else bitmap
+
+
+def _count(index, field, value, op, number):
+    path = resolve_field(index, field)
+    key = (path, value)
+    if key in index['counts']:
+        ranges = index['counts'][key]
+    elif value is None and path not in index['lists']:
+        raise ValueError(f"count() needs a list field such as 'ethernet' or 'usb_c', not '{field}'")
+    elif value is not None and not any(path.startswith(f"{parent}.") for parent in index['lists']):
+        raise ValueError(f"count() with a value needs a field inside a list, not '{field}'")
+    else:
+        # A known field, but no device has this value
+        ranges = build_range([], 0)
+
+    bitmap = select_range(ranges, op, number)
+    # Devices without any matching entry have a count of zero
+    zero_matches = {'>=': 0 >= number, '>': 0 > number, '<=': 0 <= number, '<': 0 < number, '=': number == 0, '!=': number != 0}[op]
+    if zero_matches:
+        bitmap |= index['all'] & ~ranges['any']
+    return bitmap
+
+
+def evaluate(index, node):
+    kind = node[0]
+    if kind == 'and':
+        return evaluate(index, node[1]) & evaluate(index, node[2])
+    if kind == 'or':
+        return evaluate(index, node[1]) | evaluate(index, node[2])
+    if kind == 'not':
+        return index['all'] & ~evaluate(index, node[1])
+    if kind == 'term':
+        return _compare(index, node[1], node[2], node[3])
+    if kind == 'count':
+        return _count(index, node[1], node[2], node[3], node[4])
+    return index['exists'].get(resolve_field(index, node[1]), 0)
+
+
+def run_query(index, text):
+    # Parsed queries are memoized per index, so repeated queries only pay for the bitmap work
+    if text not in index['queries']:
+        index['queries'][text] = parse_query(text)
+    return evaluate(index, index['queries'][text])
+
+
+def query_ids(index, text):
+    return [index['ids'][doc] for doc in iter_bits(run_query(index, text))]
+
+
+def query_records(index, text):
+    return [index['records'][doc] for doc in iter_bits(run_query(index, text))]
+
+
+def describe_fields(index):
+    rows = []
+    for path in sorted(set(index['exists']) | set(index['values']) | set(index['numbers'])):
+        if path in index['numbers']:
+            values = index['numbers'][path]['values']
+            rows.append((path, 'number', f"{values[0]:g}..{values[-1]:g}"))
+        elif path in index['values']:
+            size = len(index['paths'])
+            values = sorted(index['values'][path], key=lambda value: -as_bitmap(index['values'][path][value], size).bit_count())
+            summary = ', '.join(values[:6]) + (', ...' if len(values) > 6 else '')
+            rows.append((path, 'value', summary if len(summary) <= 80 else summary[:77] + '...'))
+        else:
+            rows.append((path, 'list' if path in index['lists'] else 'group', ''))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query the device catalog through bitmap indexes',
+        epilog='Example: device_query.py "count(ethernet=2.5GbE)>=2 AND oculink AND memory.type=DDR5"')
+    parser.add_argument('query', nargs='*', help='Filters such as memory.type=DDR5, cores>=8, oculink or count(usb_c)>=2; several are ANDed')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--records', action='store_true', help='Print the full matching records as JSON lines instead of ids')
+    parser.add_argument('--paths', action='store_true', help='Print the matching device files instead of ids')
+    parser.add_argument('--count', action='store_true', help='Only print the number of matches')
+    parser.add_argument('--fields', action='store_true', help='List the indexed fields and aliases')
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        index = build_query_index(load_catalog(args.devices_dir, args.cache_file))
+        built = time.perf_counter() - start
+
+        if args.fields:
+            for path, kind, values in describe_fields(index):
+                print(f"{path:<44} {kind:<7} {values}")
+            print('\nAliases: ' + ', '.join(f"{alias}={path}" for alias, path in ALIASES.items()))
+            return 0
+        parts = [part for part in args.query if part.strip()]
+        if not parts:
+            parser.error('a query is required unless --fields is given')
+
+        text = ' AND '.join(f"({part})" for part in parts)
+        start = time.perf_counter()
+        docs = list(iter_bits(run_query(index, text)))
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.count:
+        print(len(docs))
+    for doc in [] if args.count else docs:
+        if args.records:
+            print(json.dumps(index['records'][doc], default=str))
+        elif args.paths:
+            print(index['paths'][doc])
+        else:
+            print(index['ids'][doc])
+
+    print(f"{len(docs)} of {len(index['paths'])} devices matched in {elapsed * 1e6:.0f}us "
+          f"(index built in {built * 1000:.1f}ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import device_ingest
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+DEFAULT_CONCURRENCY = 4
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_LABEL = 'new-device'
+MAX_PENDING = 256
+MAX_PAYLOAD_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+REQUEST_TIMEOUT = 10.0
+RECENT_RESULTS = 100
+REASONS = {
+    200: 'OK',
+    202: 'Accepted',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    408: 'Request Timeout',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def wants_event(event, payload, label=DEFAULT_LABEL):
+    # Same trigger as the "Process New Device Issue" workflow
+    if event != 'issues' or not isinstance(payload.get('issue'), dict):
+        return False
+    action = payload.get('action')
+    if action == 'labeled':
+        return isinstance(payload.get('label'), dict) and payload['label'].get('name') == label
+    if action == 'edited':
+        labels = payload['issue'].get('labels')
+        return isinstance(labels, list) and any(isinstance(item, dict) and item.get('name') == label for item in labels)
+    return False
+
+
+def sign_payload(secret, body):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    try:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(400, 'Malformed request line')
+
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, sep, value = line.decode('latin-1').partition(':')
+        if not sep:
+            raise HTTPError(400, 'Malformed header')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(400, 'Too many headers')
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, 'Invalid Content-Length')
+    if length > MAX_PAYLOAD_BYTES:
+        raise HTTPError(413, f"Payload larger than {MAX_PAYLOAD_BYTES} bytes")
+
+    body = await reader.readexactly(length) if length > 0 else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+
+class DeviceService:
+    def __init__(self, output_directory, concurrency=DEFAULT_CONCURRENCY, debounce=DEFAULT_DEBOUNCE,
+                 label=DEFAULT_LABEL, secret=None, max_pending=MAX_PENDING, **options):
+        self.ingest = device_ingest
+        self.output_directory = output_directory
+        self.concurrency = concurrency
+        self.debounce = debounce
+        self.label = label
+        self.secret = secret
+        self.max_pending = max_pending
+        self.options = options
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.semaphore = None
+        self.write_lock = threading.Lock()
+        self.issues = {}
+        self.results = {}
+        self.stats = {'received': 0, 'ignored': 0, 'coalesced': 0, 'processed': 0, 'failed': 0}
+        self.started = time.time()
+        self.warm_seconds = None
+
+    def warm(self):
+        # Load the catalog and indexes once so each event only pays for its own issue
+        start = time.perf_counter()
+        self.ingest._device_indexes.clear()
+        self.ingest._cpu_indexes.clear()
+        self.ingest._similarity_indexes.clear()
+        if os.path.isdir(self.output_directory) and self.options.get('on_duplicate', 'warn') != 'ignore':
+            self.ingest.get_device_index(self.output_directory)
+        if self.options.get('fill_cpu'):
+            self.ingest.get_cpu_index(self.output_directory)
+        self.warm_seconds = time.perf_counter() - start
+        return self.warm_seconds
+
+    def submit(self, number, body):
+        loop = asyncio.get_running_loop()
+        state = self.issues.get(number)
+        if state is None:
+            if len(self.issues) >= self.max_pending:
+                raise HTTPError(503, f"{len(self.issues)} issues already pending")
+            state = self.issues[number] = {'body': body, 'updated': loop.time(), 'events': 1}
+            state['task'] = asyncio.create_task(self._run_issue(number, state))
+            return False
+
+        # An edit that lands before the previous one started replaces it; one
+        # that lands while it runs queues a single follow-up run
+        coalesced = state['body'] is not None
+        state['body'] = body
+        state['updated'] = loop.time()
+        state['events'] += 1
+        if coalesced:
+            self.stats['coalesced'] += 1
+        return coalesced
+
+    async def _run_issue(self, number, state):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                delay = state['updated'] + self.debounce - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                body, events = state['body'], state['events']
+                state['body'], state['events'] = None, 0
+                async with self.semaphore:
+                    result = await loop.run_in_executor(self.executor, self._process, number, body)
+                result['events'] = events
+                self._record(number, result)
+
+                if state['body'] is None:
+                    return
+        finally:
+            del self.issues[number]
+
+    def _process(self, number, body):
+        start = time.perf_counter()
+        try:
+            data = self.ingest.build_device(body, self.output_directory, **dict(self.options, on_duplicate='ignore'))
+            # Checking for duplicates, writing and indexing the device are one step, so
+            # two submissions processed side by side are still compared with each other
+            with self.write_lock:
+                self.ingest.check_duplicates(data, self.output_directory, self.options.get('on_duplicate', 'warn'))
+                file_path = self.ingest.update_yaml_file(data, self.output_directory)[0]
+                self.ingest.index_written_device(data, self.output_directory)
+            result = {'status': 'ok', 'file': file_path}
+        except Exception as e:
+            result = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+        result.update(issue=number, seconds=round(time.perf_counter() - start, 6), finished_at=time.time())
+        return result
+
+    def _record(self, number, result):
+        self.stats['processed' if result['status'] == 'ok' else 'failed'] += 1
+        self.results.pop(number, None)
+        self.results[number] = result
+        while len(self.results) > RECENT_RESULTS:
+            del self.results[next(iter(self.results))]
+        outcome = result.get('file') or result.get('error')
+        print(f"#{number}: {result['status']} in {result['seconds'] * 1000:.1f}ms "
+              f"({result['events']} event(s)): {outcome}", file=sys.stderr)
+
+    def status(self):
+        return {
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'warm_seconds': round(self.warm_seconds, 6) if self.warm_seconds is not None else None,
+            'concurrency': self.concurrency,
+            'debounce_seconds': self.debounce,
+            'pending': sorted(self.issues),
+            'stats': dict(self.stats),
+            'results': list(self.results.values()),
+        }
+
+    async def handle_webhook(self, headers, body):
+        if self.secret and not hmac.compare_digest(sign_payload(self.secret, body), headers.get('x-hub-signature-256', '')):
+            raise HTTPError(401, 'Invalid or missing X-Hub-Signature-256')
+
+        event = headers.get('x-github-event', '')
+        if event == 'ping':
+            return 200, {'pong': True}
+
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON payload: {e}")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, 'Payload must be a JSON object')
+
+        self.stats['received'] += 1
+        if not wants_event(event, payload, self.label):
+            self.stats['ignored'] += 1
+            return 200, {'ignored': f"{event}/{payload.get('action')} is not a {self.label} submission"}
+
+        issue = payload['issue']
+        coalesced = self.submit(issue.get('number'), issue.get('body') or '')
+        return 202, {'issue': issue.get('number'), 'coalesced': coalesced}
+
+    async def route(self, method, path, headers, body):
+        if path == '/webhook':
+            if method != 'POST':
+                raise HTTPError(405, 'Use POST')
+            return await self.handle_webhook(headers, body)
+        if path == '/status':
+            if method != 'GET':
+                raise HTTPError(405, 'Use GET')
+            return 200, self.status()
+        if path == '/reload':
+            if method != 'POST':
+                raise HTTPError(405, 'Use POST')
+            seconds = await asyncio.get_running_loop().run_in_executor(self.executor, self.warm)
+            return 200, {'warm_seconds': round(seconds, 6)}
+        raise HTTPError(404, f"No route for {path}")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(read_request(reader), REQUEST_TIMEOUT)
+            status, payload = await self.route(*request)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except asyncio.TimeoutError:
+            status, payload = 408, {'error': 'Timed out reading the request'}
+        except asyncio.IncompleteReadError:
+            status, payload = 400, {'error': 'Request body shorter than Content-Length'}
+        except Exception as e:
+            # Never leave the client without a status line
+            print(f"Error: unhandled {type(e).__name__} serving a request: {e}", file=sys.stderr)
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+        content = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n")
+        try:
+            writer.write(head.encode('latin-1') + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.warm)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def drain(self):
+        while self.issues:
+            await asyncio.gather(*[state['task'] for state in list(self.issues.values())], return_exceptions=True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+async def serve(service, host, port):
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Listening on http://{address[0]}:{address[1]} (catalog warmed in {service.warm_seconds * 1000:.0f}ms)", file=sys.stderr)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    async with server:
+        await stop.wait()
+    # Stop accepting events but finish the ones already accepted
+    await service.drain()
+    service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve device issue webhooks from a warm process')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--output-dir', default='data/devices', help='Output directory for the YAML files')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Maximum issues processed at the same time')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, help='Seconds to wait for further edits of an issue before processing it')
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING, help='Maximum issues waiting or in progress before new ones get a 503')
+    parser.add_argument('--label', default=DEFAULT_LABEL, help='Issue label that marks a device submission')
+    parser.add_argument('--secret', default=os.environ.get('GITHUB_WEBHOOK_SECRET'), help='Webhook secret for X-Hub-Signature-256 (default: $GITHUB_WEBHOOK_SECRET)')
+    parser.add_argument('--on-duplicate', choices=['warn', 'error', 'ignore'], default='warn', help='What to do when the device collides with or closely matches an existing one')
+    parser.add_argument('--on-invalid', choices=['warn', 'error', 'ignore'], default='warn', help='What to do when the device fails the data validation rules')
+    parser.add_argument('--fill-cpu', action='store_true', help="Match the CPU against CPUs already in the catalog: use the catalog's spelling of its model and fill in or cross-check its specs")
+    args = parser.parse_args()
+
+    try:
+        service = DeviceService(args.output_dir, concurrency=args.concurrency, debounce=args.debounce, label=args.label,
+                                secret=args.secret, max_pending=args.max_pending, on_duplicate=args.on_duplicate,
+                                on_invalid=args.on_invalid, fill_cpu=args.fill_cpu)
+        asyncio.run(serve(service, args.host, args.port))
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from device_analytics import _get, _number, ethernet_mbps
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+LEAF_SIZE = 16
+DEFAULT_K = 5
+ARCHITECTURE_WEIGHT = 1.5
+
+
+def _port_count(entries, matches=None):
+    total = 0.0
+    for entry in entries if isinstance(entries, list) else [entries] if isinstance(entries, dict) else []:
+        if not isinstance(entry, dict) or (matches and not matches(entry)):
+            continue
+        count = _number(entry.get('count'))
+        total += 1.0 if np.isnan(count) else count
+    return total
+
+
+def _is_usb4(entry):
+    return bool(entry.get('thunderbolt_version')) or any(
+        word in str(entry.get('type') or '').lower() for word in ('usb4', 'thunderbolt'))
+
+
+def _nic_speeds(data):
+    ethernet = _get(data, ('networking', 'ethernet'))
+    return [(_number(entry.get('ports')), ethernet_mbps(entry.get('speed')) / 1000)
+            for entry in (ethernet if isinstance(ethernet, list) else []) if isinstance(entry, dict)]
+
+
+def _ethernet_ports(data):
+    return sum(1.0 if np.isnan(ports) else ports for ports, _ in _nic_speeds(data))
+
+
+def _max_nic_gbps(data):
+    return max([speed for _, speed in _nic_speeds(data)], default=0.0)
+
+
+def _oculink(data):
+    ports = _get(data, ('expansion', 'oculink_ports'))
+    if isinstance(ports, list):
+        return float(len(ports))
+    count = _number(_get(data, ('ports', 'oculink')))
+    return 0.0 if np.isnan(count) else count
+
+
+# Feature -> (function reading its raw value from a device, weight after scaling)
+FEATURES = {
+    'cores': (lambda data: _number(_get(data, ('cpu', 'cores'))), 1.0),
+    'threads': (lambda data: _number(_get(data, ('cpu', 'threads'))), 1.0),
+    'base_clock': (lambda data: _number(_get(data, ('cpu', 'base_clock'))), 0.5),
+    'boost_clock': (lambda data: _number(_get(data, ('cpu', 'boost_clock'))), 0.5),
+    'tdp': (lambda data: _number(_get(data, ('cpu', 'tdp'))), 1.0),
+    'max_memory': (lambda data: _number(_get(data, ('memory', 'max_capacity'))), 1.0),
+    'memory_slots': (lambda data: _number(_get(data, ('memory', 'slots'))), 0.5),
+    'usb_a': (lambda data: _port_count(_get(data, ('ports', 'usb_a'))), 0.5),
+    'usb_c': (lambda data: _port_count(_get(data, ('ports', 'usb_c'))), 0.5),
+    'usb4': (lambda data: _port_count(_get(data, ('ports', 'usb_c')), _is_usb4), 0.75),
+    'display_outputs': (lambda data: _port_count(_get(data, ('ports', 'hdmi'))) + _port_count(_get(data, ('ports', 'displayport'))), 0.5),
+    'ethernet_ports': (_ethernet_ports, 1.0),
+    'nic_gbps': (_max_nic_gbps, 1.0),
+    'pcie_slots': (lambda data: _port_count(_get(data, ('expansion', 'pcie_slots'))), 0.75),
+    'oculink': (_oculink, 0.5),
+    'storage_slots': (lambda data: float(len(data['storage'])) if isinstance(data.get('storage'), list) else 0.0, 0.5),
+    'width': (lambda data: _number(_get(data, ('dimensions', 'width'))), 0.5),
+    'depth': (lambda data: _number(_get(data, ('dimensions', 'depth'))), 0.5),
+    'height': (lambda data: _number(_get(data, ('dimensions', 'height'))), 0.5),
+}
+ALIASES = {'ethernet': 'nic_gbps', 'nic': 'nic_gbps', 'ram': 'max_memory', 'thunderbolt': 'usb4'}
+
+
+def raw_features(data, overrides=None):
+    values = [read(data) for read, _ in FEATURES.values()]
+    for name, value in (overrides or {}).items():
+        values[list(FEATURES).index(ALIASES.get(name, name))] = value
+    return values
+
+
+def encode(index, data, overrides=None):
+    # Missing values land on the catalog mean, so they neither attract nor repel
+    values = (np.array(raw_features(data, overrides), dtype=float) - index['means']) / index['scales']
+    values = np.where(np.isnan(values), 0.0, values) * index['weights']
+    architecture = np.zeros(len(index['architectures']))
+    code = index['architecture_codes'].get(_get(data, ('cpu', 'architecture')))
+    if code is not None:
+        architecture[code] = ARCHITECTURE_WEIGHT
+    return np.concatenate([values, architecture])
+
+
+def build_tree(points, leaf_size=LEAF_SIZE):
+    # Ball tree over a permutation of the points: every node keeps a slice
+    # [start, end) of `order`, a centre and the radius that covers its slice
+    order = np.arange(len(points))
+    nodes = []
+
+    def build(start, end):
+        node = len(nodes)
+        members = points[order[start:end]]
+        center = members.mean(axis=0)
+        radius = float(np.sqrt(((members - center) ** 2).sum(axis=1).max())) if end > start else 0.0
+        nodes.append([start, end, center, radius, None, None])
+        if end - start > leaf_size:
+            # Split on the widest dimension at the median
+            spread = members.max(axis=0) - members.min(axis=0)
+            if spread.max() > 0:
+                middle = (start + end) // 2
+                split = np.argpartition(members[:, int(spread.argmax())], middle - start)
+                order[start:end] = order[start:end][split]
+                nodes[node][4] = build(start, middle)
+                nodes[node][5] = build(middle, end)
+        return node
+
+    if len(points):
+        build(0, len(points))
+    return {'order': order, 'nodes': nodes, 'points': points}
+
+
+def query_tree(tree, point, k=DEFAULT_K, exclude=()):
+    # Best-first search: nodes come off the heap by the smallest distance any of
+    # their points could have, and stop mattering once that beats the kth best
+    if not tree['nodes']:
+        return []
+    best = []
+    heap = [(0.0, 0)]
+    while heap:
+        bound, node = heapq.heappop(heap)
+        if len(best) == k and bound >= -best[0][0]:
+            break
+        start, end, _, _, left, right = tree['nodes'][node]
+        if left is None:
+            rows = tree['order'][start:end]
+            distances = np.sqrt(((tree['points'][rows] - point) ** 2).sum(axis=1))
+            for row, distance in zip(rows.tolist(), distances.tolist()):
+                if row in exclude:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, -row))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, -row))
+            continue
+        for child in (left, right):
+            _, _, center, radius, _, _ = tree['nodes'][child]
+            lower = max(0.0, float(np.sqrt(((point - center) ** 2).sum())) - radius)
+            if len(best) < k or lower < -best[0][0]:
+                heapq.heappush(heap, (lower, child))
+    return sorted((-distance, -row) for distance, row in best)
+
+
+def build_similarity_index(catalog, leaf_size=LEAF_SIZE):
+    paths = sorted(path for path, data in catalog.items() if isinstance(data, dict))
+    records = [catalog[path] for path in paths]
+    raw = np.array([raw_features(data) for data in records], dtype=float).reshape(len(records), len(FEATURES))
+    with np.errstate(invalid='ignore'):
+        means = np.nanmean(raw, axis=0) if len(records) else np.zeros(len(FEATURES))
+        scales = np.nanstd(raw, axis=0) if len(records) else np.ones(len(FEATURES))
+    means = np.where(np.isnan(means), 0.0, means)
+    scales = np.where(np.isnan(scales) | (scales == 0), 1.0, scales)
+    architectures = sorted({_get(data, ('cpu', 'architecture')) for data in records} - {None, ''}, key=str)
+    index = {
+        'paths': paths,
+        'ids': [data.get('id') for data in records],
+        'means': means,
+        'scales': scales,
+        'weights': np.array([weight for _, weight in FEATURES.values()]),
+        'architectures': architectures,
+        'architecture_codes': {architecture: code for code, architecture in enumerate(architectures)},
+    }
+    points = np.array([encode(index, data) for data in records]).reshape(len(records), len(FEATURES) + len(architectures))
+    index['tree'] = build_tree(points, leaf_size)
+    return index
+
+
+def find_similar(index, data, k=DEFAULT_K, overrides=None):
+    # The device itself is never its own match, whether or not it is already in the catalog
+    exclude = {row for row, device_id in enumerate(index['ids']) if device_id and device_id == data.get('id')}
+    matches = query_tree(index['tree'], encode(index, data, overrides), k, exclude)
+    return [{'id': index['ids'][row], 'path': index['paths'][row], 'distance': round(distance, 3)}
+            for distance, row in matches]
+
+
+def format_match(match):
+    return f"{match['distance']:7.3f}  {match['id']} ({match['path']})"
+
+
+def parse_override(text):
+    name, sep, value = text.partition('=')
+    name = ALIASES.get(name.strip(), name.strip())
+    if not sep or name not in FEATURES:
+        raise argparse.ArgumentTypeError(f"expected FEATURE=NUMBER with one of: {', '.join(list(FEATURES) + list(ALIASES))}")
+    try:
+        return name, float(value.lower().removesuffix('gbe'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a number")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Find the devices with the closest specs',
+        epilog='Example: device_similar.py minisforum-ms-a1-8700g --with nic=10')
+    parser.add_argument('device', help='Device id or path (relative to --devices-dir) to find neighbours of')
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help='Number of matches to show')
+    parser.add_argument('--with', dest='overrides', type=parse_override, action='append', default=[], metavar='FEATURE=VALUE',
+                        help='Look for devices like this one but with a different value, e.g. nic=10 for 10GbE (repeatable)')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    args = parser.parse_args()
+
+    try:
+        catalog = load_catalog(args.devices_dir, args.cache_file)
+        start = time.perf_counter()
+        index = build_similarity_index(catalog)
+        built = time.perf_counter() - start
+
+        data = catalog.get(args.device)
+        if data is None:
+            data = next((catalog[path] for path, device_id in zip(index['paths'], index['ids'])
+                         if device_id and device_id.lower() == args.device.lower()), None)
+        if data is None:
+            raise ValueError(f"No device with id or path {args.device}")
+
+        start = time.perf_counter()
+        matches = find_similar(index, data, args.k, dict(args.overrides))
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for match in matches:
+        print(format_match(match))
+    print(f"{len(matches)} matches in {elapsed * 1000:.2f}ms (index of {len(index['ids'])} devices built in {built * 1000:.1f}ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
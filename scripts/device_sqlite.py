@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, device_hash, load_catalog
+
+SCHEMA_VERSION = 1
+DEFAULT_DATABASE = '.cache/devices.sqlite'
+
+SCHEMA = '''
+CREATE TABLE devices (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    path TEXT,
+    brand TEXT,
+    model TEXT,
+    release_date TEXT,
+    cpu_brand TEXT,
+    cpu_model TEXT,
+    cpu_architecture TEXT,
+    cpu_cores INTEGER,
+    cpu_threads INTEGER,
+    cpu_base_clock REAL,
+    cpu_boost_clock REAL,
+    cpu_tdp REAL,
+    cpu_socket TEXT,
+    memory_type TEXT,
+    memory_module_type TEXT,
+    memory_slots INTEGER,
+    memory_speed REAL,
+    memory_max_capacity REAL,
+    wifi_standard TEXT,
+    wifi_chipset TEXT,
+    bluetooth TEXT,
+    width REAL,
+    depth REAL,
+    height REAL,
+    adapter_wattage REAL,
+    dc_input TEXT,
+    notes TEXT,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX devices_brand ON devices (brand);
+CREATE INDEX devices_cpu ON devices (cpu_brand, cpu_model);
+CREATE INDEX devices_cpu_cores ON devices (cpu_cores);
+CREATE INDEX devices_memory ON devices (memory_type, memory_max_capacity);
+
+CREATE TABLE ethernet (
+    device_id TEXT NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    ports INTEGER,
+    speed TEXT,
+    chipset TEXT,
+    interface TEXT,
+    note TEXT,
+    PRIMARY KEY (device_id, position)
+);
+CREATE INDEX ethernet_speed ON ethernet (speed, ports);
+
+CREATE TABLE storage (
+    device_id TEXT NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type TEXT,
+    form_factor TEXT,
+    interface TEXT,
+    alt_interface TEXT,
+    PRIMARY KEY (device_id, position)
+);
+CREATE INDEX storage_type ON storage (type, interface);
+
+CREATE TABLE usb_ports (
+    device_id TEXT NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    type TEXT,
+    speed TEXT,
+    count INTEGER,
+    alt_mode TEXT,
+    max_resolution TEXT,
+    thunderbolt_version TEXT,
+    PRIMARY KEY (device_id, kind, position)
+);
+CREATE INDEX usb_ports_type ON usb_ports (kind, type);
+CREATE INDEX usb_ports_thunderbolt ON usb_ports (thunderbolt_version);
+
+CREATE TABLE gpus (
+    device_id TEXT NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type TEXT,
+    model TEXT,
+    vram TEXT,
+    PRIMARY KEY (device_id, position)
+);
+CREATE INDEX gpus_model ON gpus (model);
+
+CREATE TABLE expansion_slots (
+    device_id TEXT NOT NULL REFERENCES devices (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    type TEXT,
+    version TEXT,
+    form_factor TEXT,
+    count INTEGER,
+    note TEXT,
+    PRIMARY KEY (device_id, kind, position)
+);
+CREATE INDEX expansion_slots_kind ON expansion_slots (kind, version);
+
+CREATE VIRTUAL TABLE device_search USING fts5 (brand, model, cpu_model, notes, tokenize = 'unicode61');
+'''
+
+# Child table -> (columns, function returning (kind or None, records) pairs for a device)
+USB_KINDS = ['usb_a', 'usb_c', 'usb4', 'usb_micro']
+EXPANSION_KINDS = {'pcie_slots': 'pcie', 'mpcie_slots': 'mpcie', 'sim_slots': 'sim', 'oculink_ports': 'oculink'}
+CHILD_TABLES = {
+    'ethernet': (['ports', 'speed', 'chipset', 'interface', 'note'],
+                 lambda data: [(None, (data.get('networking') or {}).get('ethernet'))]),
+    'storage': (['type', 'form_factor', 'interface', 'alt_interface'],
+                lambda data: [(None, data.get('storage'))]),
+    'usb_ports': (['type', 'speed', 'count', 'alt_mode', 'max_resolution', 'thunderbolt_version'],
+                  lambda data: [(kind, (data.get('ports') or {}).get(kind)) for kind in USB_KINDS]),
+    'gpus': (['type', 'model', 'vram'],
+             lambda data: [(None, data.get('gpu'))]),
+    'expansion_slots': (['type', 'version', 'form_factor', 'count', 'note'],
+                        lambda data: [(kind, (data.get('expansion') or {}).get(key)) for key, kind in EXPANSION_KINDS.items()]),
+}
+
+
+def _get(data, *keys):
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _scalar(value):
+    # Columns are typed loosely, but nested values never belong in them
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+def device_notes(data):
+    notes = data.get('notes') or data.get('Notes')
+    if isinstance(notes, list):
+        return '\n'.join(str(note) for note in notes)
+    return notes
+
+
+def device_row(data, rel_path=None):
+    socket = _get(data, 'cpu', 'socket', 'type')
+    row = {
+        'id': data['id'],
+        'path': rel_path,
+        'brand': data.get('brand'),
+        'model': data.get('model'),
+        'release_date': data.get('release_date'),
+        'cpu_brand': _get(data, 'cpu', 'brand'),
+        'cpu_model': _get(data, 'cpu', 'model'),
+        'cpu_architecture': _get(data, 'cpu', 'architecture'),
+        'cpu_cores': _get(data, 'cpu', 'cores'),
+        'cpu_threads': _get(data, 'cpu', 'threads'),
+        'cpu_base_clock': _get(data, 'cpu', 'base_clock'),
+        'cpu_boost_clock': _get(data, 'cpu', 'boost_clock'),
+        'cpu_tdp': _get(data, 'cpu', 'tdp'),
+        'cpu_socket': socket,
+        'memory_type': _get(data, 'memory', 'type'),
+        'memory_module_type': _get(data, 'memory', 'module_type'),
+        'memory_slots': _get(data, 'memory', 'slots'),
+        'memory_speed': _get(data, 'memory', 'speed'),
+        'memory_max_capacity': _get(data, 'memory', 'max_capacity'),
+        'wifi_standard': _get(data, 'networking', 'wifi', 'standard'),
+        'wifi_chipset': _get(data, 'networking', 'wifi', 'chipset'),
+        'bluetooth': _get(data, 'networking', 'wifi', 'bluetooth'),
+        'width': _get(data, 'dimensions', 'width'),
+        'depth': _get(data, 'dimensions', 'depth'),
+        'height': _get(data, 'dimensions', 'height'),
+        'adapter_wattage': _get(data, 'power', 'adapter_wattage'),
+        'dc_input': _get(data, 'power', 'dc_input'),
+        'notes': device_notes(data),
+    }
+    return {column: _scalar(value) for column, value in row.items()}
+
+
+def connect(database=DEFAULT_DATABASE):
+    directory = os.path.dirname(database)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(database)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version != SCHEMA_VERSION:
+        # Derived data only, so an old layout is simply rebuilt
+        with conn:
+            for name, kind in conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') "
+                                           "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'device_search_%'").fetchall():
+                conn.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+            conn.executescript(SCHEMA)
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+
+def _insert_children(conn, device_id, data):
+    for table, (columns, sources) in CHILD_TABLES.items():
+        kinds = [(kind, records) for kind, records in sources(data) if isinstance(records, list)]
+        for kind, records in kinds:
+            rows = []
+            for position, record in enumerate(records):
+                if not isinstance(record, dict):
+                    continue
+                values = [_scalar(record.get(column)) for column in columns]
+                rows.append([device_id] + ([kind] if kind else []) + [position] + values)
+            if rows:
+                names = ['device_id'] + (['kind'] if kind else []) + ['position'] + columns
+                placeholders = ', '.join('?' for _ in names)
+                conn.executemany(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})", rows)
+
+
+def upsert_device(conn, data, rel_path=None):
+    digest = device_hash(data)
+    existing = conn.execute('SELECT rowid, content_hash, path FROM devices WHERE id = ?', (data['id'],)).fetchone()
+    if existing and existing[1] == digest and (rel_path is None or existing[2] == rel_path):
+        return 'unchanged'
+
+    row = device_row(data, rel_path)
+    row['content_hash'] = digest
+    row['data'] = json.dumps(data, default=str)
+    columns = list(row)
+    updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column != 'id')
+
+    conn.execute(f"INSERT INTO devices ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                 f"ON CONFLICT (id) DO UPDATE SET {updates}", [row[column] for column in columns])
+    rowid = conn.execute('SELECT rowid FROM devices WHERE id = ?', (data['id'],)).fetchone()[0]
+
+    for table in CHILD_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE device_id = ?", (data['id'],))
+    _insert_children(conn, data['id'], data)
+
+    conn.execute('DELETE FROM device_search WHERE rowid = ?', (rowid,))
+    conn.execute('INSERT INTO device_search (rowid, brand, model, cpu_model, notes) VALUES (?, ?, ?, ?, ?)',
+                 (rowid, row['brand'], row['model'], row['cpu_model'], row['notes']))
+    return 'updated' if existing else 'inserted'
+
+
+def delete_device(conn, device_id):
+    existing = conn.execute('SELECT rowid FROM devices WHERE id = ?', (device_id,)).fetchone()
+    if not existing:
+        return False
+    conn.execute('DELETE FROM device_search WHERE rowid = ?', (existing[0],))
+    conn.execute('DELETE FROM devices WHERE rowid = ?', (existing[0],))
+    return True
+
+
+def export_catalog(conn, catalog, prune=True):
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'skipped': 0}
+    seen = set()
+    with conn:
+        for rel_path, data in catalog.items():
+            if not isinstance(data, dict) or not data.get('id') or data['id'] in seen:
+                stats['skipped'] += 1
+                continue
+            seen.add(data['id'])
+            stats[upsert_device(conn, data, rel_path)] += 1
+
+        if prune:
+            for (device_id,) in conn.execute('SELECT id FROM devices').fetchall():
+                if device_id not in seen:
+                    delete_device(conn, device_id)
+                    stats['deleted'] += 1
+    return stats
+
+
+def export_devices(database, items):
+    conn = connect(database)
+    try:
+        with conn:
+            return [upsert_device(conn, data, rel_path) for rel_path, data in items]
+    finally:
+        conn.close()
+
+
+def quote_query(text):
+    # Each word becomes an FTS5 string, so "i5-1235U" or a stray quote is searched for
+    # rather than read as a column filter or query syntax
+    terms = text.split()
+    if not terms:
+        raise ValueError('Search query is empty')
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(conn, text, limit=20, raw=False):
+    return conn.execute(
+        'SELECT d.id, d.brand, d.model, d.cpu_model FROM device_search s JOIN devices d ON d.rowid = s.rowid '
+        'WHERE device_search MATCH ? ORDER BY bm25(device_search) LIMIT ?',
+        (text if raw else quote_query(text), limit)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the device catalog to an incrementally updated SQLite database')
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help='SQLite database to create or update')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--rebuild', action='store_true', help='Delete the database and export everything again')
+    parser.add_argument('--no-prune', action='store_true', help='Keep devices whose YAML file no longer exists')
+    parser.add_argument('--search', help='Run a full-text query over brand, model, CPU model and notes instead of exporting')
+    parser.add_argument('--raw', action='store_true', help='Pass --search to FTS5 as query syntax (OR, NEAR, prefix*, column:) instead of as plain words')
+    args = parser.parse_args()
+
+    try:
+        if args.rebuild:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(args.database + suffix):
+                    os.remove(args.database + suffix)
+
+        conn = connect(args.database)
+        if args.search is not None:
+            for device_id, brand, model, cpu_model in search(conn, args.search, raw=args.raw):
+                print(f"{device_id:<40} {brand} {model} ({cpu_model})")
+            return 0
+
+        start = time.perf_counter()
+        stats = export_catalog(conn, load_catalog(args.devices_dir, args.cache_file), prune=not args.no_prune)
+        elapsed = time.perf_counter() - start
+        conn.close()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{args.database}: {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+          f"{stats['deleted']} deleted, {stats['skipped']} skipped in {elapsed * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
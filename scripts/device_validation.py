@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import re
+import sys
+import time
+
+from device_catalog import DEFAULT_DEVICES_DIR, iter_device_files, parse_device_file
+
+# hashlib and json are imported where they are used: device_ingest --check only needs validate_device
+
+# Rule tables mirror scripts/validate-data.cjs; keep both in sync
+VALID_CPU_BRANDS = ['Intel', 'AMD', 'ARM', 'Qualcomm', 'Apple', 'Broadcom', 'Raspberry Pi', 'MediaTek', 'Samsung', 'Nvidia', 'Rockchip', 'Allwinner', 'Texas Instruments', 'Marvell']
+VALID_MEMORY_TYPES = ['DDR', 'DDR2', 'DDR3', 'DDR3L', 'DDR4', 'DDR5', 'LPDDR2', 'LPDDR3', 'LPDDR4', 'LPDDR4X', 'LPDDR5', 'SRAM', 'GDDR5', 'GDDR6', 'HBM']
+VALID_MEMORY_MODULE_TYPES = ['SODIMM', 'DIMM', 'Soldered', 'SO-DIMM', 'Embedded', 'MicroDIMM', 'RDIMM', 'UDIMM', 'LRDIMM']
+VALID_STORAGE_TYPES = ['M.2', 'SATA', 'NVMe', '2.5"', 'mSATA', 'eMMC', 'microSD', 'MicroSD Card', 'SD Card', 'U.2', 'Flash', 'CFast', 'CFexpress', 'NVDIMM', 'Optane']
+VALID_STORAGE_FORM_FACTORS = {
+    'M.2': ['2280', '2260', '2242', '2230', '22110', '2260', '22110', '2280/U.2', '2230/2280', '2280/22110', '2230/2242/2280', 'Open'],
+    'SATA': ['2.5"', '2.5', '3.5"', '3.5'],
+    'mSATA': ['Full Size', 'Half Size'],
+    'eMMC': [],
+    'Flash': [],
+    'MicroSD Card': ['MicroSD'],
+    'SD Card': ['SD'],
+    'U.2': ['2.5"', '2.5'],
+    'CFast': ['Type I', 'Type II'],
+    'CFexpress': ['Type A', 'Type B', 'Type C'],
+    'NVDIMM': ['DIMM'],
+    'Optane': ['M.2', '2.5"', '2.5']
+}
+VALID_WIFI_STANDARDS = ['WiFi', 'WiFi 4', 'WiFi 5', 'WiFi 6', 'WiFi 6E', 'WiFi 7', 'None']
+VALID_ETHERNET_SPEEDS = ['100Mbps', '1GbE', '2.5GbE', '5GbE', '10GbE']
+VALID_PCIE_TYPES = ['x1', 'x4', 'x8', 'x16', 'Mini PCIe', 'M.2']
+VALID_PCIE_VERSIONS = [
+    'PCIe 2.0', 'PCIe 3.0', 'PCIe 4.0', 'PCIe 5.0',
+    '2.0', '3.0', '4.0', '5.0',
+    'PCIe 2.0 x1', 'PCIe 2.0 x2', 'PCIe 2.0 x4', 'PCIe 2.0 x8', 'PCIe 2.0 x16',
+    'PCIe 2.1 x1', 'PCIe 2.1 x2', 'PCIe 2.1 x4', 'PCIe 2.1 x8', 'PCIe 2.1 x16',
+    'PCIe 3.0 x1', 'PCIe 3.0 x2', 'PCIe 3.0 x4', 'PCIe 3.0 x8', 'PCIe 3.0 x16',
+    'PCIe 4.0 x1', 'PCIe 4.0 x2', 'PCIe 4.0 x4', 'PCIe 4.0 x8', 'PCIe 4.0 x16',
+    'PCIe 5.0 x1', 'PCIe 5.0 x2', 'PCIe 5.0 x4', 'PCIe 5.0 x8', 'PCIe 5.0 x16'
+]
+VALID_CPU_SOCKETS = [
+    'AM4', 'AM5', 'AM3+', 'AM3', 'AM2+', 'AM2', 'FM1', 'FM2', 'FM2+',
+    'LGA 1700', 'LGA 1200', 'LGA 1151', 'LGA 1150', 'LGA 1155', 'LGA 1156', 'LGA 775', 'LGA 771',
+    'LGA1700', 'LGA1200', 'LGA1151', 'LGA1150', 'LGA1155', 'LGA1156', 'LGA775', 'LGA771',
+    'SP3', 'SP5', 'sTRX4', 'sTR4', 'sWRX8', 'sWRX80',
+    'BGA', 'PGA', 'FCBGA', 'FCLGA'
+]
+VALID_OCULINK_VERSIONS = ['OCuLink 1.0', 'OCuLink 2.0']
+VALID_ETHERNET_INTERFACES = ['RJ45', 'SFP', 'SFP+', 'SFP28', '10GBASE-T']
+
+DEFAULT_CACHE_FILE = '.cache/device-validation.json'
+YEAR_REGEX = re.compile(r'^[0-9]{4}$')
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def _rules_version():
+    import hashlib
+
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    return _is_number(value) and float(value).is_integer()
+
+
+def _is_falsy(value):
+    # JavaScript truthiness: empty lists and dicts are truthy, 0 and '' are not
+    return value is None or value is False or value == '' or (_is_number(value) and value == 0)
+
+
+def _js_str(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _join(values):
+    return ', '.join(values)
+
+
+def _error(errors, data, device_file, message, path, critical):
+    errors.append({
+        'deviceId': data.get('id') or 'unknown',
+        'file': device_file,
+        'message': message,
+        'path': path,
+        'critical': critical,
+    })
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value):
+    return value if isinstance(value, list) else []
+
+
+def validate_required_fields(data, path, errors, device_file):
+    for field in ['id', 'brand', 'model', 'release_date', 'cpu', 'memory', 'storage']:
+        if _is_falsy(data.get(field)):
+            _error(errors, data, device_file, f"Missing required top-level field: {field}", f"{path}.{field}", True)
+
+    if not _is_falsy(data.get('notes')):
+        for note in str(data['notes']).strip().split('\n'):
+            if not note.strip().startswith('-'):
+                _error(errors, data, device_file, f'Each note line must start with a dash (-). Invalid line: "{note.strip()}"', f"{path}.notes", False)
+
+    cpu = data.get('cpu')
+    if not _is_falsy(cpu):
+        cpu = _dict(cpu)
+        is_diy_machine = _dict(cpu.get('socket')).get('supports_cpu_swap') is True
+        fields_to_check = ['brand', 'model', 'architecture'] if is_diy_machine else ['brand', 'model', 'cores', 'threads', 'base_clock', 'architecture']
+
+        for field in fields_to_check:
+            if field not in cpu:
+                _error(errors, data, device_file, f"Missing required CPU field: {field}", f"{path}.cpu.{field}", True)
+
+        if is_diy_machine and _is_falsy(_dict(cpu.get('socket')).get('type')):
+            _error(errors, data, device_file, "DIY machine must specify CPU socket type", f"{path}.cpu.socket.type", True)
+
+        if not _is_falsy(cpu.get('core_config')):
+            core_types = _dict(cpu['core_config']).get('types')
+            if not isinstance(core_types, list):
+                _error(errors, data, device_file, "CPU core_config.types must be an array", f"{path}.cpu.core_config.types", True)
+            else:
+                total_cores = 0
+                for index, core_type in enumerate(core_types):
+                    core_type = _dict(core_type)
+                    if _is_falsy(core_type.get('type')):
+                        _error(errors, data, device_file, f"Missing core type name in core_config.types[{index}]", f"{path}.cpu.core_config.types[{index}].type", True)
+
+                    if not _is_number(core_type.get('count')):
+                        _error(errors, data, device_file, f"Missing or invalid core count in core_config.types[{index}]", f"{path}.cpu.core_config.types[{index}].count", True)
+                    else:
+                        total_cores += core_type['count']
+
+                    boost_clock = core_type.get('boost_clock')
+                    if not _is_number(boost_clock) or boost_clock <= 0:
+                        _error(errors, data, device_file, f"Missing or invalid boost_clock in core_config.types[{index}]", f"{path}.cpu.core_config.types[{index}].boost_clock", True)
+
+                if total_cores != cpu.get('cores'):
+                    _error(errors, data, device_file, f"Sum of core counts in core_config ({_js_str(total_cores)}) does not match total cores ({_js_str(cpu.get('cores'))})", f"{path}.cpu.core_config", True)
+
+    memory = data.get('memory')
+    if not _is_falsy(memory):
+        memory = _dict(memory)
+        for field in ['max_capacity', 'slots', 'type', 'speed']:
+            if field not in memory:
+                _error(errors, data, device_file, f"Missing required memory field: {field}", f"{path}.memory.{field}", True)
+
+        if _is_falsy(memory.get('module_type')):
+            _error(errors, data, device_file, "Missing memory.module_type (SODIMM/DIMM)", f"{path}.memory.module_type", False)
+
+    networking = data.get('networking')
+    if not _is_falsy(networking):
+        networking = _dict(networking)
+        # Ethernet is optional - only validate if present and not "None"
+        ethernet = networking.get('ethernet')
+        if not _is_falsy(ethernet) and ethernet != 'None':
+            if not isinstance(ethernet, list):
+                _error(errors, data, device_file, 'Networking.ethernet must be an array (or "None" if not present)', f"{path}.networking.ethernet", True)
+            else:
+                for index, eth in enumerate(ethernet):
+                    for field in ['chipset', 'speed', 'ports', 'interface']:
+                        if field not in _dict(eth):
+                            _error(errors, data, device_file, f"Missing required ethernet[{index}] field: {field}", f"{path}.networking.ethernet[{index}].{field}", True)
+
+        # WiFi is optional - only validate if present and not "None"
+        wifi = networking.get('wifi')
+        if isinstance(wifi, dict):
+            for field in ['chipset', 'standard', 'bluetooth']:
+                if field not in wifi:
+                    _error(errors, data, device_file, f"Missing required wifi field: {field}", f"{path}.networking.wifi.{field}", True)
+
+    storage_list = data.get('storage')
+    if isinstance(storage_list, list):
+        for index, storage in enumerate(storage_list):
+            storage = _dict(storage)
+            is_embedded_storage = storage.get('interface') == 'Embedded' or storage.get('type') in ('Flash', 'eMMC')
+            required_storage_fields = ['type', 'interface'] if is_embedded_storage else ['type', 'form_factor', 'interface']
+
+            for field in required_storage_fields:
+                if field not in storage:
+                    _error(errors, data, device_file, f"Missing required storage[{index}] field: {field}", f"{path}.storage[{index}].{field}", True)
+
+            valid_form_factors = VALID_STORAGE_FORM_FACTORS.get(storage.get('type'))
+            if not _is_falsy(storage.get('form_factor')) and valid_form_factors and storage['form_factor'] not in valid_form_factors:
+                _error(errors, data, device_file, f"Invalid form_factor '{_js_str(storage['form_factor'])}' for storage type '{storage['type']}'. Valid options: {_join(valid_form_factors)}", f"{path}.storage[{index}].form_factor", False)
+    else:
+        _error(errors, data, device_file, "Storage must be an array", f"{path}.storage", True)
+
+    gpu_list = data.get('gpu')
+    if not _is_falsy(gpu_list):
+        if isinstance(gpu_list, list):
+            for index, gpu in enumerate(gpu_list):
+                gpu = _dict(gpu)
+                if _is_falsy(gpu.get('model')) or _is_falsy(gpu.get('type')):
+                    _error(errors, data, device_file, f"Missing required GPU[{index}] fields: model or type", f"{path}.gpu[{index}]", True)
+                if not _is_falsy(gpu.get('type')) and gpu['type'] not in ('Integrated', 'Discrete'):
+                    _error(errors, data, device_file, f"Invalid GPU type: {_js_str(gpu['type'])}. Must be either 'Integrated' or 'Discrete'", f"{path}.gpu[{index}].type", True)
+                if gpu.get('type') == 'Discrete' and _is_falsy(gpu.get('vram')):
+                    _error(errors, data, device_file, f"Discrete GPU[{index}] must specify VRAM amount", f"{path}.gpu[{index}].vram", True)
+        else:
+            _error(errors, data, device_file, "GPU must be an array", f"{path}.gpu", True)
+
+    expansion = data.get('expansion')
+    if not _is_falsy(expansion):
+        expansion = _dict(expansion)
+        for index, port in enumerate(_list(expansion.get('oculink_ports'))):
+            if _is_falsy(_dict(port).get('version')):
+                _error(errors, data, device_file, f"Missing required OCuLink port[{index}] field: version", f"{path}.expansion.oculink_ports[{index}].version", True)
+
+        for index, slot in enumerate(_list(expansion.get('sim_slots'))):
+            slot = _dict(slot)
+            if _is_falsy(slot.get('type')) or _is_falsy(slot.get('count')):
+                _error(errors, data, device_file, f"Missing required SIM slot[{index}] fields: type and count are required", f"{path}.expansion.sim_slots[{index}]", True)
+
+        for index, slot in enumerate(_list(expansion.get('mpcie_slots'))):
+            slot = _dict(slot)
+            if _is_falsy(slot.get('type')) or _is_falsy(slot.get('count')):
+                _error(errors, data, device_file, f"Missing required mPCIe slot[{index}] fields: type and count are required", f"{path}.expansion.mpcie_slots[{index}]", True)
+
+
+def validate_data_types(data, path, errors, device_file):
+    for field in ['id', 'brand', 'model']:
+        if not _is_falsy(data.get(field)) and not isinstance(data[field], str):
+            _error(errors, data, device_file, f"{field} must be a string", f"{path}.{field}", True)
+
+    if not _is_falsy(data.get('release_date')):
+        if not isinstance(data['release_date'], str) or not YEAR_REGEX.match(data['release_date']):
+            _error(errors, data, device_file, 'release_date must be a 4-digit year string (e.g., "2023")', f"{path}.release_date", False)
+
+    cpu = data.get('cpu')
+    if not _is_falsy(cpu):
+        cpu = _dict(cpu)
+        is_diy_machine = _dict(cpu.get('socket')).get('supports_cpu_swap') is True
+
+        if not is_diy_machine:
+            for field in ['cores', 'threads']:
+                if field in cpu and (not _is_integer(cpu[field]) or cpu[field] <= 0):
+                    _error(errors, data, device_file, f"cpu.{field} must be a positive integer", f"{path}.cpu.{field}", True)
+
+            for field in ['base_clock', 'boost_clock']:
+                if field in cpu and (not _is_number(cpu[field]) or cpu[field] <= 0):
+                    _error(errors, data, device_file, f"cpu.{field} must be a positive number", f"{path}.cpu.{field}", True)
+
+        if 'tdp' in cpu and (not _is_number(cpu['tdp']) or cpu['tdp'] <= 0):
+            _error(errors, data, device_file, "If provided, cpu.tdp must be a positive number", f"{path}.cpu.tdp", True)
+
+    memory = data.get('memory')
+    if not _is_falsy(memory):
+        memory = _dict(memory)
+        if 'max_capacity' in memory and (not _is_number(memory['max_capacity']) or memory['max_capacity'] <= 0):
+            _error(errors, data, device_file, "memory.max_capacity must be a positive number", f"{path}.memory.max_capacity", True)
+
+        if 'slots' in memory and (not _is_integer(memory['slots']) or memory['slots'] < 0):
+            _error(errors, data, device_file, "memory.slots must be a non-negative integer", f"{path}.memory.slots", True)
+
+        if 'speed' in memory and (not _is_number(memory['speed']) or memory['speed'] <= 0):
+            _error(errors, data, device_file, "memory.speed must be a positive number", f"{path}.memory.speed", True)
+
+    socket = _dict(data.get('cpu')).get('socket')
+    if not _is_falsy(socket):
+        socket = _dict(socket)
+        if not isinstance(socket.get('type'), str):
+            _error(errors, data, device_file, "cpu.socket.type must be a string", f"{path}.cpu.socket.type", True)
+        if not isinstance(socket.get('supports_cpu_swap'), bool):
+            _error(errors, data, device_file, "cpu.socket.supports_cpu_swap must be a boolean", f"{path}.cpu.socket.supports_cpu_swap", True)
+
+
+def _check_value(errors, data, device_file, value, valid_values, label, path, critical):
+    if _is_falsy(value) or value in valid_values:
+        return
+    if critical:
+        message = f"Invalid {label}: {_js_str(value)}. Must be one of: {_join(valid_values)}"
+    else:
+        message = f"Unknown {label}: {_js_str(value)}. Known values: {_join(valid_values)}"
+    _error(errors, data, device_file, message, path, critical)
+
+
+def validate_enum_values(data, path, errors, device_file):
+    cpu = _dict(data.get('cpu'))
+    memory = _dict(data.get('memory'))
+    networking = _dict(data.get('networking'))
+    expansion = _dict(data.get('expansion'))
+
+    _check_value(errors, data, device_file, cpu.get('brand'), VALID_CPU_BRANDS, 'cpu.brand', f"{path}.cpu.brand", False)
+    _check_value(errors, data, device_file, memory.get('type'), VALID_MEMORY_TYPES, 'memory.type', f"{path}.memory.type", False)
+    _check_value(errors, data, device_file, memory.get('module_type'), VALID_MEMORY_MODULE_TYPES, 'memory.module_type', f"{path}.memory.module_type", False)
+
+    for index, storage in enumerate(_list(data.get('storage'))):
+        _check_value(errors, data, device_file, _dict(storage).get('type'), VALID_STORAGE_TYPES, f"storage[{index}].type", f"{path}.storage[{index}].type", False)
+
+    _check_value(errors, data, device_file, _dict(networking.get('wifi')).get('standard'), VALID_WIFI_STANDARDS, 'wifi.standard', f"{path}.networking.wifi.standard", False)
+
+    for index, eth in enumerate(_list(networking.get('ethernet'))):
+        _check_value(errors, data, device_file, _dict(eth).get('speed'), VALID_ETHERNET_SPEEDS, f"ethernet[{index}].speed", f"{path}.networking.ethernet[{index}].speed", False)
+
+    for index, slot in enumerate(_list(expansion.get('pcie_slots'))):
+        slot = _dict(slot)
+        _check_value(errors, data, device_file, slot.get('type'), VALID_PCIE_TYPES, f"pcie_slots[{index}].type", f"{path}.expansion.pcie_slots[{index}].type", False)
+        _check_value(errors, data, device_file, slot.get('version'), VALID_PCIE_VERSIONS, f"pcie_slots[{index}].version", f"{path}.expansion.pcie_slots[{index}].version", False)
+
+    _check_value(errors, data, device_file, _dict(cpu.get('socket')).get('type'), VALID_CPU_SOCKETS, 'cpu.socket.type', f"{path}.cpu.socket.type", False)
+
+    for index, port in enumerate(_list(expansion.get('oculink_ports'))):
+        _check_value(errors, data, device_file, _dict(port).get('version'), VALID_OCULINK_VERSIONS, f"oculink_ports[{index}].version", f"{path}.expansion.oculink_ports[{index}].version", False)
+
+
+def validate_logical_constraints(data, path, errors, device_file):
+    cpu = _dict(data.get('cpu'))
+
+    if 'base_clock' in cpu and 'boost_clock' in cpu:
+        if _is_number(cpu['base_clock']) and _is_number(cpu['boost_clock']) and cpu['base_clock'] > cpu['boost_clock']:
+            _error(errors, data, device_file, f"CPU base_clock ({_js_str(cpu['base_clock'])}) cannot be greater than boost_clock ({_js_str(cpu['boost_clock'])})", f"{path}.cpu", True)
+
+    if 'cores' in cpu and 'threads' in cpu:
+        if _is_number(cpu['cores']) and _is_number(cpu['threads']) and cpu['threads'] < cpu['cores']:
+            _error(errors, data, device_file, f"CPU threads ({_js_str(cpu['threads'])}) cannot be less than cores ({_js_str(cpu['cores'])})", f"{path}.cpu", True)
+
+    if isinstance(data.get('id'), str) and data['id'] and isinstance(data.get('brand'), str) and data['brand']:
+        expected_prefix = WHITESPACE_REGEX.sub('-', data['brand'].lower())
+        if not data['id'].startswith(expected_prefix):
+            _error(errors, data, device_file, f"ID should start with brand name in lowercase with dashes ({expected_prefix}-*)", f"{path}.id", False)
+
+    for index, port in enumerate(_list(_dict(data.get('ports')).get('usb_c'))):
+        port = _dict(port)
+        if port.get('thunderbolt_compatible') is True and _is_falsy(port.get('thunderbolt_version')):
+            _error(errors, data, device_file, "USB-C port with Thunderbolt compatibility must specify thunderbolt_version", f"{path}.ports.usb_c[{index}]", True)
+
+
+def validate_field_values(data, path, errors, device_file):
+    cpu = _dict(data.get('cpu'))
+    memory = _dict(data.get('memory'))
+    networking = _dict(data.get('networking'))
+    expansion = _dict(data.get('expansion'))
+
+    _check_value(errors, data, device_file, cpu.get('brand'), VALID_CPU_BRANDS, 'CPU brand', f"{path}.cpu.brand", True)
+    _check_value(errors, data, device_file, memory.get('type'), VALID_MEMORY_TYPES, 'memory type', f"{path}.memory.type", True)
+    _check_value(errors, data, device_file, memory.get('module_type'), VALID_MEMORY_MODULE_TYPES, 'memory module type', f"{path}.memory.module_type", True)
+
+    for index, storage in enumerate(_list(data.get('storage'))):
+        _check_value(errors, data, device_file, _dict(storage).get('type'), VALID_STORAGE_TYPES, 'storage type', f"{path}.storage[{index}].type", True)
+
+    _check_value(errors, data, device_file, _dict(networking.get('wifi')).get('standard'), VALID_WIFI_STANDARDS, 'WiFi standard', f"{path}.networking.wifi.standard", True)
+
+    for index, eth in enumerate(_list(networking.get('ethernet'))):
+        eth = _dict(eth)
+        _check_value(errors, data, device_file, eth.get('speed'), VALID_ETHERNET_SPEEDS, 'ethernet speed', f"{path}.networking.ethernet[{index}].speed", True)
+        _check_value(errors, data, device_file, eth.get('interface'), VALID_ETHERNET_INTERFACES, 'ethernet interface', f"{path}.networking.ethernet[{index}].interface", True)
+
+    _check_value(errors, data, device_file, _dict(cpu.get('socket')).get('type'), VALID_CPU_SOCKETS, 'CPU socket type', f"{path}.cpu.socket.type", True)
+
+    for index, port in enumerate(_list(expansion.get('oculink_ports'))):
+        _check_value(errors, data, device_file, _dict(port).get('version'), VALID_OCULINK_VERSIONS, 'OCuLink version', f"{path}.expansion.oculink_ports[{index}].version", True)
+
+
+def validate_device(data, device_file):
+    if not isinstance(data, dict):
+        return [{
+            'deviceId': 'unknown',
+            'file': device_file,
+            'message': 'Error parsing YAML: device file does not contain a mapping',
+            'path': '',
+            'critical': True
+        }]
+
+    errors = []
+    validate_required_fields(data, '', errors, device_file)
+    validate_data_types(data, '', errors, device_file)
+    validate_enum_values(data, '', errors, device_file)
+    validate_logical_constraints(data, '', errors, device_file)
+    validate_field_values(data, '', errors, device_file)
+    return errors
+
+
+def validate_file(path, content=None):
+    try:
+        data = parse_device_file(path, content)
+    except (OSError, ValueError) as e:
+        return [{
+            'deviceId': os.path.splitext(os.path.basename(path))[0],
+            'file': path,
+            'message': f"Failed to parse YAML: {e}",
+            'path': '',
+            'critical': True
+        }]
+    return validate_device(data, path)
+
+
+def iter_validation_targets(devices_dir):
+    for rel_path in iter_device_files(devices_dir):
+        if not rel_path.endswith('.WIP.yaml'):
+            yield os.path.join(devices_dir, rel_path)
+
+
+def read_result_cache(cache_file):
+    import json
+
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('rules') != _rules_version():
+        return {}
+    return cache.get('files', {})
+
+
+def write_result_cache(cache_file, files):
+    import json
+
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'rules': _rules_version(), 'files': files}, f)
+    os.replace(tmp_path, cache_file)
+
+
+def _validate_job(job):
+    path, content = job
+    return validate_file(path, content)
+
+
+def validate_files(paths, workers=None, cache_file=DEFAULT_CACHE_FILE, stats=None):
+    import hashlib
+
+    cached = read_result_cache(cache_file)
+    results = {}
+    jobs = []
+    digests = {}
+    reused = 0
+
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            results[path] = [{
+                'deviceId': 'unknown',
+                'file': path,
+                'message': f"File does not exist: {path}" if not os.path.exists(path) else str(e),
+                'path': '',
+                'critical': True
+            }]
+            continue
+
+        digest = hashlib.sha256(content).hexdigest()
+        entry = cached.get(path)
+        if entry and entry['sha256'] == digest:
+            results[path] = entry['errors']
+            reused += 1
+        else:
+            digests[path] = digest
+            jobs.append((path, content))
+
+    if workers == 1 or len(jobs) < 2:
+        validated = [_validate_job(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            validated = list(executor.map(_validate_job, jobs, chunksize=16))
+
+    for (path, _), errors in zip(jobs, validated):
+        results[path] = errors
+
+    if cache_file and jobs:
+        files = {path: entry for path, entry in cached.items() if os.path.exists(path)}
+        for path, digest in digests.items():
+            files[path] = {'sha256': digest, 'errors': results[path]}
+        write_result_cache(cache_file, files)
+
+    if stats is not None:
+        stats.update({'files': len(results), 'validated': len(jobs), 'cached': reused})
+
+    return [error for path in paths for error in results.get(path, [])]
+
+
+def watch(paths_fn, interval, workers, cache_file):
+    import json
+
+    mtimes = {}
+    while True:
+        touched = []
+        current = {}
+        for path in paths_fn():
+            try:
+                current[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if mtimes.get(path) != current[path]:
+                touched.append(path)
+        first_pass = not mtimes
+        mtimes = current
+
+        if touched:
+            errors = validate_files(touched, workers, cache_file)
+            label = f"{len(touched)} files" if first_pass else ', '.join(touched)
+            if errors:
+                print(json.dumps(errors, indent=2))
+            print(f"[{time.strftime('%H:%M:%S')}] Validated {label}: {len(errors)} errors", flush=True)
+
+        time.sleep(interval)
+
+
+def main():
+    import json
+
+    parser = argparse.ArgumentParser(description='Validate device YAML files')
+    parser.add_argument('files', nargs='*', help='Specific device files to validate (default: the whole devices directory)')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the per-file validation result cache')
+    parser.add_argument('--no-cache', action='store_true', help='Validate every file even if it is unchanged')
+    parser.add_argument('--watch', action='store_true', help='Keep running and revalidate files as they change')
+    parser.add_argument('--interval', type=float, default=1.0, help='Polling interval in seconds for --watch')
+    args = parser.parse_args()
+
+    cache_file = None if args.no_cache else args.cache_file
+
+    def paths():
+        return args.files or list(iter_validation_targets(args.devices_dir))
+
+    if args.watch:
+        try:
+            watch(paths, args.interval, args.workers, cache_file)
+        except KeyboardInterrupt:
+            return 0
+
+    try:
+        errors = validate_files(paths(), args.workers, cache_file)
+    except Exception as e:
+        print(f"Validation failed: {e}", file=sys.stderr)
+        return 1
+
+    if errors:
+        print(json.dumps(errors, indent=2))
+        return 1
+
+    print('No validation errors found.')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
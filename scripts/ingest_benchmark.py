@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import device_ingest
+from yaml_emitter import dump_device, write_atomic
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE_FILE = 'benchmarks/ingest-baseline.json'
+DEFAULT_THRESHOLD = 0.25
+CHUNK_SIZE = 1000
+STAGES = ['parse', 'core_config', 'build', 'dump', 'write']
+
+BRANDS = ['Beelink', 'Minisforum', 'GMKtec', 'Geekom', 'ASRock', 'Topton', 'Aoostar', 'Acemagic', 'HP', 'Dell']
+CPUS = [
+    ('Intel', 'N100', 4, 4, 0.8, 3.4, 6, 'Alder Lake', None),
+    ('Intel', 'N150', 4, 4, 0.8, 3.6, 6, 'Twin Lake', None),
+    ('Intel', 'i5-1235U', 10, 12, 1.3, 4.4, 15, 'Alder Lake', [('P-core', 2, 4.4), ('E-core', 8, 3.3)]),
+    ('Intel', 'Core i7-13700H', 14, 20, 2.4, 5.0, 45, 'Raptor Lake', [('P-core', 6, 5.0), ('E-core', 8, 3.7)]),
+    ('Intel', 'Core Ultra 7 155H', 16, 22, 1.4, 4.8, 28, 'Meteor Lake', [('P-core', 6, 4.8), ('E-core', 8, 3.8), ('LP E-core', 2, 2.5)]),
+    ('AMD', 'Ryzen 7 7840HS', 8, 16, 3.8, 5.1, 35, 'Zen 4', None),
+    ('AMD', 'Ryzen 9 9955HX', 16, 32, 2.5, 5.4, 55, 'Zen 5', None),
+    ('AMD', 'Ryzen 5 5600U', 6, 12, 2.3, 4.2, 15, 'Zen 3', None),
+    ('Rockchip', 'RK3588', 8, 8, 1.8, 2.4, 10, 'Cortex-A76/A55', [('Cortex-A76', 4, 2.4), ('Cortex-A55', 4, 1.8)]),
+]
+MEMORY = [('DDR4', 'SODIMM', 3200), ('DDR5', 'SODIMM', 5600), ('LPDDR5', 'Soldered', 6400), ('LPDDR4X', 'Soldered', 4266)]
+STORAGE_LINES = [
+    'Type: M.2, Form Factor: 2280, Interface: PCIe 4.0 x4',
+    'Type: M.2, Form Factor: 2280, Interface: PCIe 3.0 x4, Alt Interface: SATA',
+    'Type: M.2, Form Factor: 2242, Interface: SATA',
+    'Type: SATA, Form Factor: 2.5',
+    'Type: eMMC, Interface: Embedded',
+]
+ETHERNET_LINES = [
+    'Type: 1GbE, Chipset: Realtek RTL8111H, Interface: RJ45',
+    'Type: 2.5GbE, Chipset: Intel I226-V, Interface: RJ45',
+    'Type: 2.5GbE, Chipset: Realtek RTL8125BG, Interface: RJ45',
+    'Type: 10GbE, Chipset: Intel X710, Interface: SFP+',
+]
+USB_LINES = [
+    'Type: USB 3.2, Speed: Gen 2, Count: 2',
+    'Type: USB 3.2, Speed: Gen 1, Count: 2',
+    'Type: USB 2.0, Speed: 480Mbps, Count: 2',
+    'Type: USB-C, Count: 1, Speed: 10Gbps, Alt Mode: DisplayPort 1.4, Max Resolution: 4K@60Hz',
+    'Type: USB4, Count: 2, Speed: 40Gbps, Alt Mode: DisplayPort 1.4, Max Resolution: 8K@60Hz, Thunderbolt: USB4',
+]
+DISPLAY_LINES = [
+    'Type: HDMI, Count: 1, Version: 2.1, Form Factor: Full-size, Max Resolution: 4K@120Hz',
+    'Type: HDMI, Count: 2, Version: 2.0, Max Resolution: 4K@60Hz',
+    'Type: DisplayPort, Count: 1, Version: 1.4, Max Resolution: 8K@60Hz',
+]
+NO_RESPONSE = '_No response_'
+
+
+def _lines(rng, pool, low, high):
+    return '\n'.join(rng.choice(pool) for _ in range(rng.randint(low, high)))
+
+
+def _optional(rng, value, probability=0.7):
+    return value if rng.random() < probability else NO_RESPONSE
+
+
+def generate_issue_body(rng, index):
+    brand = rng.choice(BRANDS)
+    cpu_brand, cpu_model, cores, threads, base_clock, boost_clock, tdp, architecture, core_types = rng.choice(CPUS)
+    memory_type, module_type, memory_speed = rng.choice(MEMORY)
+
+    if core_types:
+        core_config = '\n'.join(f"- Type: {name}, Count: {count}, Boost Clock: {clock}" for name, count, clock in core_types)
+    else:
+        core_config = NO_RESPONSE
+
+    fields = [
+        ('Device ID', f"SYN-{index}"),
+        ('Brand', brand),
+        ('Model', f"SYN-{index}"),
+        ('Release Date', str(rng.randint(2018, 2026))),
+        ('CPU Brand', cpu_brand),
+        ('CPU Model', cpu_model),
+        ('CPU TDP (Watts)', _optional(rng, str(tdp), 0.9)),
+        ('CPU Cores', str(cores)),
+        ('CPU Threads', str(threads)),
+        ('Base Clock (GHz)', str(base_clock)),
+        ('Boost Clock (GHz)', _optional(rng, str(boost_clock), 0.8)),
+        ('CPU Architecture', architecture),
+        ('CPU Socket Type', 'None'),
+        ('Core Configuration', core_config),
+        ('GPU Models', _optional(rng, 'Type: Integrated, Model: Integrated Graphics')),
+        ('Memory Type', memory_type),
+        ('Memory Module Type', module_type),
+        ('Memory Slots', '0' if module_type == 'Soldered' else str(rng.randint(1, 2))),
+        ('Maximum Memory Capacity (GB)', str(rng.choice([16, 32, 64, 96, 128]))),
+        ('Memory Speed (MT/s)', str(memory_speed)),
+        ('Storage Details', _lines(rng, STORAGE_LINES, 1, 6)),
+        ('WiFi Standard', _optional(rng, rng.choice(['Wi-Fi 6', 'Wi-Fi 6E', 'WiFi 7']))),
+        ('WiFi Chipset', _optional(rng, rng.choice(['Intel AX201', 'MediaTek MT7922', 'Intel BE200']))),
+        ('Bluetooth Version', _optional(rng, rng.choice(['5.2', '5.3', '5.4']))),
+        ('Ethernet Ports', _optional(rng, _lines(rng, ETHERNET_LINES, 1, 8), 0.9)),
+        ('PCIe Slots', _optional(rng, '- Type: PCIe 4.0 x16, Form Factor: Half Height', 0.1)),
+        ('OCuLink Ports', _optional(rng, '1x OCuLink 2.0', 0.2)),
+        ('SIM Card Slots', _optional(rng, '- Type: 4G/3G SIM slot, Count: 1', 0.05)),
+        ('mPCIe Slots', _optional(rng, '- Count: 1, Type: mPCIe wireless slot, Note: For WiFi/4G/3G modules', 0.05)),
+        ('USB Ports', _lines(rng, USB_LINES, 2, 12)),
+        ('Display Ports', _lines(rng, DISPLAY_LINES, 1, 3)),
+        ('Audio Jacks', rng.choice(['None', '1', '2'])),
+        ('SD Card Reader', rng.choice(['None', 'Yes', 'No'])),
+        ('Micro SD Card Reader', rng.choice(['None', 'Yes', 'No'])),
+        ('Serial Ports', _optional(rng, '- Count: 1, Type: RJ45 COM Console', 0.1)),
+        ('IR Receiver', rng.choice(['None', 'Yes'])),
+        ('Dimensions (mm)', f"{rng.randint(60, 220)} x {rng.randint(60, 220)} x {rng.randint(20, 60)}"),
+        ('Power Adapter', rng.choice(['65W (19V/3.42A)', '120W (19V/6.32A)', '36W (12V/3A)', '90W'])),
+        ('Additional Information', _optional(rng, '\n'.join(f"- Note line {n}" for n in range(rng.randint(1, 20))), 0.3)),
+    ]
+
+    sections = [f"### {label}\n\n{value}" for label, value in fields]
+    sections.append('### Submission Confirmation\n\n- [x] I have verified all the information provided is accurate.')
+    return '\n\n'.join(sections) + '\n'
+
+
+def generate_corpus(size, seed=0):
+    rng = random.Random(seed)
+    for index in range(size):
+        yield generate_issue_body(rng, index)
+
+
+def _run_stages(ingest, bodies, output_directory, timings=None, peaks=None):
+    def timed(stage, fn, items):
+        if peaks is not None:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        results = [fn(item) for item in items]
+        if timings is not None:
+            timings[stage] += time.perf_counter() - start
+        if peaks is not None:
+            peaks[stage] = tracemalloc.get_traced_memory()[1] - before
+        return results
+
+    extracted = timed('parse', ingest.parse_issue_form, bodies)
+    timed('core_config', ingest.parse_core_config, [data.get('cpu_core_config') for data in extracted])
+    devices = timed('build', ingest.create_device_yaml, extracted)
+    texts = timed('dump', dump_device, devices)
+    # Write the dumped text, so the dump is not timed again under 'write' and the stages add up
+    paths = [ingest.device_file_path(data, output_directory) for data in devices]
+    timed('write', lambda item: write_atomic(*item), list(zip(paths, texts)))
+
+
+def run_benchmark(ingest, size, seed=0, chunk_size=CHUNK_SIZE):
+    timings = dict.fromkeys(STAGES, 0.0)
+    peaks = {}
+    corpus = generate_corpus(size, seed)
+    first_chunk = None
+
+    # Work in chunks so the corpus and the written files stay bounded at 100k items
+    while True:
+        bodies = [body for _, body in zip(range(chunk_size), corpus)]
+        if not bodies:
+            break
+        first_chunk = first_chunk or bodies
+        with tempfile.TemporaryDirectory() as output_directory:
+            _run_stages(ingest, bodies, output_directory, timings)
+
+    # Allocation tracing slows everything down, so measure memory in a separate pass
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as output_directory:
+        _run_stages(ingest, first_chunk or [], output_directory, peaks=peaks)
+    tracemalloc.stop()
+
+    return {
+        'size': size,
+        'stages': {
+            stage: {
+                'us_per_item': timings[stage] / max(size, 1) * 1e6,
+                'peak_kb_per_chunk': peaks.get(stage, 0) / 1024,
+            }
+            for stage in STAGES
+        },
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold):
+    regressions = []
+    for result in results:
+        previous = baseline.get(str(result['size']))
+        if not previous:
+            continue
+        for stage, metrics in result['stages'].items():
+            before = previous['stages'].get(stage, {}).get('us_per_item')
+            if before and metrics['us_per_item'] > before * (1 + threshold):
+                regressions.append(f"{result['size']} items, {stage}: {metrics['us_per_item']:.1f}us vs baseline {before:.1f}us "
+                                   f"(+{(metrics['us_per_item'] / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results):
+    for result in results:
+        print(f"\n{result['size']} issue bodies (max RSS {result['max_rss_mb']:.1f} MB)")
+        for stage, metrics in result['stages'].items():
+            print(f"  {stage:<12} {metrics['us_per_item']:10.1f}us/item   peak {metrics['peak_kb_per_chunk']:10.1f} KB per {CHUNK_SIZE} items")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the issue ingest pipeline on a synthetic corpus')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Corpus sizes to benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic corpus')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help='Baseline JSON file to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown per stage before failing (0.25 = 25%%)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [run_benchmark(device_ingest, size, args.seed) for size in args.sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        baseline.update({str(result['size']): result for result in results})
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        regressions = compare_to_baseline(results, json.load(f), args.threshold)
+
+    if regressions:
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo stage regressed more than {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
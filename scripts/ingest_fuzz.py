@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import mmap
+import random
+import re
+import sys
+import time
+
+import device_ingest
+from ingest_benchmark import generate_issue_body
+
+# Bodies just under the cap are read to the end; those over it must be rejected
+DEFAULT_SIZES = [device_ingest.MAX_BODY_BYTES // 4, device_ingest.MAX_BODY_BYTES // 2, device_ingest.MAX_BODY_BYTES - 1]
+OVER_CAP_SIZES = [device_ingest.MAX_BODY_BYTES + 1, 4 * device_ingest.MAX_BODY_BYTES]
+DEFAULT_CASES = 2000
+DEFAULT_BUDGET = 2.0
+# Doubling the input may at most triple the time, where quadratic matchers would
+# quadruple it; runs under MIN_TIMED_SECONDS are too short to judge
+MAX_GROWTH = 3.0
+MIN_TIMED_SECONDS = 0.01
+# Submissions are rejected with these; anything else escaping the parser is a bug
+EXPECTED_ERRORS = (ValueError, KeyError)
+
+# The matchers as they were before the parser was hardened, for differential checks
+LEGACY_POWER_ADAPTER_REGEX = re.compile(r'(\d+(?:\.\d+)?)W.*?(\d+(?:\.\d+)?)[vV].*?(\d+(?:\.\d+)?)A')
+LEGACY_OCULINK_REGEX = re.compile(r'(\d+)x?\s*(OCuLink\s*\d+\.\d+)')
+MATCHER_ALPHABET = '0123456789..WWvVAAx  -/OCuLink'
+
+# Matcher inputs that make backtracking regexes quadratic, built for n characters
+MATCHER_CASES = {
+    'power: digits after watts': (device_ingest.parse_power_adapter, lambda n: '1W' + '1' * n),
+    'power: digits after volts': (device_ingest.parse_power_adapter, lambda n: '1W 1V' + '1' * n),
+    'power: dotted digits': (device_ingest.parse_power_adapter, lambda n: '1W' + '1.' * (n // 2)),
+    'oculink: digits': (device_ingest.parse_oculink_ports, lambda n: '1' * n),
+    'oculink: spaces': (device_ingest.parse_oculink_ports, lambda n: '1x' + ' ' * n + 'OCuLink'),
+    'dimensions: separators': (device_ingest.parse_dimensions, lambda n: '1x' * (n // 2)),
+}
+
+
+def legacy_power_adapter(value):
+    match = LEGACY_POWER_ADAPTER_REGEX.match(value)
+    if match:
+        return {"adapter_wattage": float(match.group(1)), "dc_input": f"{match.group(2)}V/{match.group(3)}A"}
+    digits = re.search(r'\d+', value)
+    return {"adapter_wattage": float(digits.group())} if digits else None
+
+
+def legacy_oculink_ports(value):
+    match = LEGACY_OCULINK_REGEX.search(value)
+    if not match or int(match.group(1)) > device_ingest.MAX_OCULINK_PORTS:
+        return None
+    return [{'version': match.group(2)} for _ in range(int(match.group(1)))]
+
+
+def check_matchers(cases, seed=0):
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(cases):
+        value = ''.join(rng.choice(MATCHER_ALPHABET) for _ in range(rng.randint(0, 24)))
+        for name, new, old in (('power', device_ingest.parse_power_adapter, legacy_power_adapter),
+                               ('oculink', device_ingest.parse_oculink_ports, legacy_oculink_ports)):
+            with contextlib.redirect_stderr(io.StringIO()):
+                expected, got = old(value), new(value)
+            if expected != got:
+                failures.append(f"{name} {value!r}: expected {expected}, got {got}")
+    return failures
+
+
+def _timed(function, value):
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        try:
+            function(value)
+        except EXPECTED_ERRORS:
+            pass
+    return time.perf_counter() - start
+
+
+def time_matchers(sizes):
+    results = {}
+    for name, (function, build) in MATCHER_CASES.items():
+        results[name] = [_timed(function, build(size)) for size in sizes]
+    return results
+
+
+def _in_section(form, title, text):
+    return form.replace(f"### {title}\n\n", f"### {title}\n\n{text}", 1)
+
+
+def pathological_bodies(size):
+    # Bodies of at most `size` UTF-8 bytes. The filler always comes before the last form
+    # field, so the parser cannot stop early and has to read all of it
+    form = generate_issue_body(random.Random(0), 0)
+    filler = size - len(form.encode()) - 3
+    return {
+        'one long line': 'A' * filler + '\n' + form,
+        'one long non-ASCII line': 'é' * (filler // 2) + '\n' + form,
+        'long line in a mapped field': _in_section(form, 'Power Adapter', '1W' + '1' * (filler - 2)),
+        'many headers': '### x\n' * (filler // 6) + form,
+        'many list entries': _in_section(form, 'USB Ports', 'Count: x,' * (filler // 9) + '\n'),
+        'many short lines': 'Type: USB, Count: 1\n' * (filler // 20) + form,
+        'checkbox lines': '- [x] I agree\n' * (filler // 14) + form,
+        'one huge section': _in_section(form, 'Additional Information', 'Fan noise is low.\n' * (filler // 18)),
+        'huge non-ASCII section': _in_section(form, 'Additional Information', 'Lüfter leise.\n' * (filler // 15)),
+    }
+
+
+def time_bodies(sizes):
+    results = {}
+    unexpected = []
+    for size in sizes:
+        for name, body in pathological_bodies(size).items():
+            too_large = False
+            start = time.perf_counter()
+            with contextlib.redirect_stderr(io.StringIO()):
+                try:
+                    device_ingest.create_device_yaml(device_ingest.parse_issue_form(body))
+                    outcome = 'parsed'
+                except EXPECTED_ERRORS as e:
+                    too_large = 'is larger than' in str(e)
+                    outcome = 'rejected (too large)' if too_large else f"rejected ({type(e).__name__})"
+                except Exception as e:
+                    outcome = f"crashed ({type(e).__name__}: {e})"
+                    unexpected.append(f"{name} at {size} bytes: {type(e).__name__}: {e}")
+            results.setdefault(name, []).append((time.perf_counter() - start, outcome))
+            if too_large != (len(body.encode()) > device_ingest.MAX_BODY_BYTES):
+                unexpected.append(f"{name} at {size} bytes: {outcome}, but the cap is {device_ingest.MAX_BODY_BYTES} bytes")
+    return results, unexpected
+
+
+def mutate(rng, body):
+    lines = body.split('\n')
+    for _ in range(rng.randint(1, 8)):
+        i = rng.randrange(len(lines))
+        action = rng.randrange(6)
+        if action == 0:
+            del lines[i]
+        elif action == 1:
+            lines.insert(i, lines[rng.randrange(len(lines))])
+        elif action == 2:
+            lines[i] = re.sub(r'\d+', lambda _: rng.choice(['', 'x', '-1', '1e9', '9' * 50, 'nan']), lines[i])
+        elif action == 3:
+            lines[i] = lines[i].replace(rng.choice([',', ':', ' ', 'x']), rng.choice(['', ',,', '::', '\x00']))
+        elif action == 4:
+            lines[i] = ''.join(rng.choice('###:,-x[]_ \t0123456789WVAé‮') for _ in range(rng.randint(0, 40)))
+        else:
+            lines[i] = lines[i] * rng.randint(2, 50)
+    return '\n'.join(lines)
+
+
+def fuzz_bodies(cases, seed=0):
+    rng = random.Random(seed)
+    counts = {'parsed': 0, 'rejected': 0}
+    crashes = []
+    for index in range(cases):
+        body = mutate(rng, generate_issue_body(rng, index))
+        with contextlib.redirect_stderr(io.StringIO()):
+            try:
+                device_ingest.create_device_yaml(device_ingest.parse_issue_form(body))
+                counts['parsed'] += 1
+            except EXPECTED_ERRORS:
+                counts['rejected'] += 1
+            except Exception as e:
+                crashes.append(f"case {index}: {type(e).__name__}: {e}")
+    return counts, crashes
+
+
+def _mmap_source(body):
+    data = body.encode()
+    source = mmap.mmap(-1, len(data))
+    source.write(data)
+    source.seek(0)
+    return source
+
+
+# The CLI streams a file and callers may pass bytes or an mmap; each must parse like the str
+SOURCES = {
+    'bytes': lambda body: body.encode(),
+    'binary stream': lambda body: io.BytesIO(body.encode()),
+    'text stream': io.StringIO,
+    'mmap': _mmap_source,
+}
+
+
+def _parse(source):
+    with contextlib.redirect_stderr(io.StringIO()):
+        try:
+            return device_ingest.parse_issue_form(source)
+        except EXPECTED_ERRORS as e:
+            return f"rejected ({type(e).__name__}: {e})"
+        except Exception as e:
+            return f"crashed ({type(e).__name__}: {e})"
+
+
+def check_sources(cases, seed=0):
+    rng = random.Random(seed)
+    bodies = [mutate(rng, generate_issue_body(rng, index)) for index in range(cases)]
+    bodies += list(pathological_bodies(2 * device_ingest.MAX_LINE_BYTES).values())
+    failures = []
+    for index, body in enumerate(bodies):
+        if not body:
+            continue
+        expected = _parse(body)
+        for name, build in SOURCES.items():
+            got = _parse(build(body))
+            if got != expected:
+                failures.append(f"body {index} as {name}: expected {str(expected)[:80]}, got {str(got)[:80]}")
+    return failures
+
+
+def growth(timings):
+    # Worst slowdown between consecutive sizes, which double
+    return max((later / earlier for earlier, later in zip(timings, timings[1:])
+                if earlier > 0 and later >= MIN_TIMED_SECONDS), default=1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzz the issue parser and check it stays linear on pathological bodies')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Input sizes in bytes, each about double the previous; bodies are also run just over the cap')
+    parser.add_argument('--cases', type=int, default=DEFAULT_CASES, help='Number of mutated issue bodies and random matcher inputs')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the mutations')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='Maximum seconds for any one body')
+    args = parser.parse_args()
+
+    failures = check_matchers(args.cases, args.seed)
+    print(f"Matchers agree with the old regexes on {args.cases} random inputs: {'no' if failures else 'yes'}")
+    source_failures = check_sources(min(args.cases, 200), args.seed)
+    failures += source_failures
+    print(f"Bytes, streams and mmaps parse like the str: {'no' if source_failures else 'yes'}")
+
+    print(f"\n{'matcher':<32}" + ''.join(f"{size // 1024:>10}K" for size in args.sizes))
+    for name, timings in time_matchers(args.sizes).items():
+        print(f"{name:<32}" + ''.join(f"{seconds * 1000:>9.1f}ms" for seconds in timings))
+        if growth(timings) > MAX_GROWTH:
+            failures.append(f"{name} grows {growth(timings):.1f}x when the input doubles")
+
+    body_sizes = args.sizes + OVER_CAP_SIZES
+    results, unexpected = time_bodies(body_sizes)
+    failures += unexpected
+    print(f"\n{'issue body':<32}" + ''.join(f"{size // 1024:>10}K" for size in body_sizes))
+    for name, runs in results.items():
+        print(f"{name:<32}" + ''.join(f"{seconds * 1000:>9.1f}ms" for seconds, _ in runs) + f"  {runs[-1][1]}")
+        slowest = max(seconds for seconds, _ in runs)
+        if slowest > args.budget:
+            failures.append(f"{name} took {slowest:.2f}s, over the {args.budget:.1f}s budget")
+
+    start = time.perf_counter()
+    counts, crashes = fuzz_bodies(args.cases, args.seed)
+    elapsed = time.perf_counter() - start
+    failures += crashes
+    print(f"\n{args.cases} mutated bodies in {elapsed:.2f}s: {counts['parsed']} parsed, "
+          f"{counts['rejected']} rejected, {len(crashes)} crashed")
+
+    for failure in failures[:20]:
+        print(f"Error: {failure}", file=sys.stderr)
+    if len(failures) > 20:
+        print(f"Error: ... and {len(failures) - 20} more", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRICS_VERSION = 1
+PROFILE_LIMIT = 25
+
+
+class StageMetrics:
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.failed_stage = None
+        self.profiler = cProfile.Profile() if profile else None
+        self._open = []
+        self._mark = None
+
+    def _snapshot(self):
+        if not self.trace_memory:
+            return time.perf_counter(), 0, 0
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        # tracemalloc has a single peak counter, so carry it into every enclosing stage
+        for entry in self._open:
+            entry[1] = max(entry[1], peak)
+        return time.perf_counter(), current, peak
+
+    def _record(self, name, start, peak=0):
+        now, current, last_peak = self._snapshot()
+        entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'allocated_bytes': 0, 'peak_bytes': 0})
+        entry['calls'] += 1
+        entry['seconds'] += now - start[0]
+        if self.trace_memory:
+            entry['allocated_bytes'] += current - start[1]
+            entry['peak_bytes'] = max(entry['peak_bytes'], max(peak, last_peak) - start[1])
+        return now, current, 0
+
+    @contextmanager
+    def stage(self, name):
+        start = self._snapshot()
+        entry = [start, 0]
+        self._open.append(entry)
+        self._mark = start
+        try:
+            yield
+        except BaseException:
+            # Report the innermost stage, the outer ones only re-raise
+            if self.failed_stage is None:
+                self.failed_stage = name
+            raise
+        finally:
+            self._open.remove(entry)
+            self._mark = self._record(name, start, entry[1])
+
+    def lap(self, name):
+        # Time since the enclosing stage started or the previous lap, for
+        # breaking a stage into sections without nesting every block
+        if self._mark is not None:
+            self._mark = self._record(name, self._mark)
+
+    def merge(self, stages):
+        for name, values in stages.items():
+            entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'allocated_bytes': 0, 'peak_bytes': 0})
+            entry['calls'] += values['calls']
+            entry['seconds'] += values['seconds']
+            entry['allocated_bytes'] += values['allocated_bytes']
+            entry['peak_bytes'] = max(entry['peak_bytes'], values['peak_bytes'])
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profiler:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler:
+            self.profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def profile_rows(self, limit=PROFILE_LIMIT):
+        if not self.profiler:
+            return []
+
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{line}({function})",
+                'calls': calls,
+                'total_seconds': round(total, 6),
+                'cumulative_seconds': round(cumulative, 6),
+            })
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:limit]
+
+    def to_dict(self, **extra):
+        stages = {
+            name: {
+                'calls': entry['calls'],
+                'seconds': round(entry['seconds'], 6),
+                'allocated_bytes': entry['allocated_bytes'],
+                'peak_bytes': entry['peak_bytes'],
+            }
+            for name, entry in self.stages.items()
+        }
+        metrics = {
+            'version': METRICS_VERSION,
+            'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'trace_memory': self.trace_memory,
+            'failed_stage': self.failed_stage,
+        }
+        metrics.update(extra)
+        metrics['stages'] = stages
+        if self.profiler:
+            metrics['profile'] = self.profile_rows()
+        return metrics
+
+
+def write_metrics(path, metrics):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # A .jsonl path collects one line per run so latency can be tracked over time
+    if path.endswith('.jsonl'):
+        with open(path, 'a') as f:
+            f.write(json.dumps(metrics, sort_keys=False) + '\n')
+    else:
+        with open(path, 'w') as f:
+            json.dump(metrics, f, indent=2)
+            f.write('\n')
+    return path
+
+
+def format_stages(metrics):
+    lines = [f"{'stage':<24} {'calls':>7} {'total ms':>10} {'allocated':>12} {'peak':>12}"]
+    for name, entry in metrics['stages'].items():
+        lines.append(f"{name:<24} {entry['calls']:>7} {entry['seconds'] * 1000:>10.3f} "
+                     f"{entry['allocated_bytes'] / 1024:>10.1f}KB {entry['peak_bytes'] / 1024:>10.1f}KB")
+    for row in metrics.get('profile', [])[:10]:
+        lines.append(f"  {row['cumulative_seconds'] * 1000:>9.3f}ms {row['calls']:>7}  {row['function']}")
+    return '\n'.join(lines)
+
+
+def load_metrics(path):
+    with open(path, 'r') as f:
+        if not path.endswith('.jsonl'):
+            return [json.load(f)]
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize ingest metrics written by process-new-machine.py --metrics-json')
+    parser.add_argument('metrics_file', help='A .json metrics file, or a .jsonl file with one run per line')
+    parser.add_argument('--last', type=int, default=20, help='Number of most recent runs to show from a .jsonl file')
+    args = parser.parse_args()
+
+    try:
+        runs = load_metrics(args.metrics_file)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    runs = runs[-args.last:]
+    if len(runs) == 1:
+        print(format_stages(runs[0]))
+        return 0
+
+    names = []
+    for run in runs:
+        names.extend(name for name in run['stages'] if name not in names and '.' not in name)
+    print(f"{'recorded at':<26} {'status':<7} " + ' '.join(f"{name:>10}" for name in names))
+    for run in runs:
+        cells = [f"{run['stages'][name]['seconds'] * 1000:>8.2f}ms" if name in run['stages'] else f"{'-':>10}" for name in names]
+        print(f"{run['recorded_at']:<26} {run.get('status', '?'):<7} " + ' '.join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from device_service import DEFAULT_DEBOUNCE, DEFAULT_LABEL, DeviceService, sign_payload
+
+FIRST_ISSUE_NUMBER = 1000
+REPOSITORY = 'monstermuffin/awesome-mini-pc'
+
+
+def issue_event(action, number, body, label=DEFAULT_LABEL, labels=None):
+    labels = [label] if labels is None else labels
+    payload = {
+        'action': action,
+        'issue': {
+            'number': number,
+            'title': f"[New Device]: stand-in #{number}",
+            'state': 'open',
+            'body': body,
+            'labels': [{'name': name} for name in labels],
+            'user': {'login': 'stand-in'},
+        },
+        'repository': {'full_name': REPOSITORY},
+        'sender': {'login': 'stand-in'},
+    }
+    if action == 'labeled':
+        payload['label'] = {'name': label}
+    return payload
+
+
+def post_event(url, event, payload, secret=None):
+    body = json.dumps(payload).encode()
+    headers = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'GitHub-Hookshot/stand-in',
+        'X-GitHub-Event': event,
+        'X-GitHub-Delivery': str(uuid.uuid4()),
+    }
+    if secret:
+        headers['X-Hub-Signature-256'] = sign_payload(secret, body)
+
+    request = urllib.request.Request(f"{url}/webhook", data=body, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+def get_status(url):
+    with urllib.request.urlopen(f"{url}/status", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_local_service(output_directory, debounce, **options):
+    # Runs the service on its own event loop in a thread, on a free port
+    started = threading.Event()
+    state = {}
+
+    def run():
+        async def main():
+            service = DeviceService(output_directory, debounce=debounce, **options)
+            server = await service.start('127.0.0.1', 0)
+            state['url'] = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            state['stop'] = asyncio.Event()
+            state['loop'] = asyncio.get_running_loop()
+            started.set()
+            async with server:
+                await state['stop'].wait()
+            await service.drain()
+            service.close()
+
+        try:
+            asyncio.run(main())
+        except Exception as e:
+            state['error'] = e
+            started.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+    if 'error' in state:
+        raise state['error']
+
+    def stop():
+        state['loop'].call_soon_threadsafe(state['stop'].set)
+        thread.join()
+
+    return state['url'], stop
+
+
+def replay(url, bodies, edits=2, interval=0.05, secret=None, label=DEFAULT_LABEL, timeout=60.0):
+    sent = []
+    started = time.time()
+    # Noise a real repository also delivers, which the service must ignore
+    ignored = [
+        ('ping', {'zen': 'Keep it logically awesome.', 'hook_id': 1}),
+        ('issues', issue_event('opened', FIRST_ISSUE_NUMBER - 1, bodies[0] if bodies else '', label, labels=[])),
+        ('issues', issue_event('labeled', FIRST_ISSUE_NUMBER - 1, '', 'question', labels=['question'])),
+    ]
+    for event, payload in ignored:
+        status, response = post_event(url, event, payload, secret)
+        sent.append((event, payload.get('action'), payload.get('issue', {}).get('number'), status, response))
+
+    # Label each issue, then edit it in quick succession like a submitter fixing typos
+    for offset, body in enumerate(bodies):
+        number = FIRST_ISSUE_NUMBER + offset
+        for action in ['labeled'] + ['edited'] * edits:
+            status, response = post_event(url, 'issues', issue_event(action, number, body, label), secret)
+            sent.append(('issues', action, number, status, response))
+            time.sleep(interval)
+
+    deadline = time.monotonic() + timeout
+    expected = {number for _, _, number, code, _ in sent if code == 202}
+    while True:
+        status = get_status(url)
+        done = {result['issue'] for result in status['results'] if result['finished_at'] >= started}
+        if not status['pending'] and expected <= done:
+            return sent, status
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Issues still pending after {timeout}s: {status['pending']}")
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Post GitHub-shaped issue events to the device webhook service')
+    parser.add_argument('bodies', nargs='+', help='Issue body files; each becomes one labeled issue followed by rapid edits')
+    parser.add_argument('--url', help='Base URL of a running device_service.py (default: start one in-process)')
+    parser.add_argument('--output-dir', help='Output directory for an in-process service (default: a temporary directory)')
+    parser.add_argument('--edits', type=int, default=2, help='Number of edited events sent after each labeled event')
+    parser.add_argument('--interval', type=float, default=0.05, help='Seconds between events for the same issue')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, help='Debounce of the in-process service')
+    parser.add_argument('--secret', help='Webhook secret to sign events with')
+    parser.add_argument('--label', default=DEFAULT_LABEL, help='Issue label that marks a device submission')
+    args = parser.parse_args()
+
+    bodies = []
+    for path in args.bodies:
+        with open(path, 'r') as f:
+            bodies.append(f.read())
+
+    temp_dir = None
+    stop = None
+    try:
+        url = args.url
+        if not url:
+            output_directory = args.output_dir
+            if not output_directory:
+                temp_dir = tempfile.TemporaryDirectory()
+                output_directory = temp_dir.name
+            url, stop = start_local_service(output_directory, args.debounce, secret=args.secret, label=args.label)
+        sent, status = replay(url, bodies, args.edits, args.interval, args.secret, args.label)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stop:
+            stop()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    for event, action, number, code, response in sent:
+        print(f"{code} {event}/{action} #{number}: {json.dumps(response)}")
+
+    print()
+    for result in status['results']:
+        outcome = result.get('file') or result.get('error')
+        print(f"#{result['issue']} {result['status']} after {result['events']} event(s) in {result['seconds'] * 1000:.1f}ms: {outcome}")
+
+    stats = status['stats']
+    rejected = sum(1 for event in sent if event[3] >= 400)
+    print(f"\n{stats['received']} events, {stats['ignored']} ignored, {stats['coalesced']} coalesced, "
+          f"{stats['processed']} processed, {stats['failed']} failed, {rejected} rejected")
+    return 1 if stats['failed'] or rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
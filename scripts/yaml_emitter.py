@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+from device_catalog import DEFAULT_CACHE_FILE, DEFAULT_DEVICES_DIR, load_catalog
+
+DUMP_OPTIONS = {'default_flow_style': False, 'sort_keys': False, 'width': 120}
+ESCAPE_REGEX = re.compile(r'\\.')
+# Created like open() would, so the kernel applies the umask; os.umask() is never touched
+TEMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+FILE_MODE = 0o666
+
+
+def _folds_quoted_scalar(text):
+    # An odd number of unescaped quotes means a double-quoted scalar runs onto the next line
+    return '"' in text and any(ESCAPE_REGEX.sub('', line).count('"') % 2 for line in text.splitlines())
+
+
+def dump_device(data, dumper=SafeDumper):
+    text = yaml.dump(data, Dumper=dumper, **DUMP_OPTIONS)
+    # libyaml folds long double-quoted scalars without the escaped spaces PyYAML writes;
+    # keep the files byte-identical by letting the pure-Python dumper emit those
+    if dumper is not yaml.SafeDumper and _folds_quoted_scalar(text):
+        text = yaml.dump(data, Dumper=yaml.SafeDumper, **DUMP_OPTIONS)
+    return text
+
+
+def _write_temp(path, text):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        # The random part keeps threads of one process apart; O_EXCL never reuses a name
+        tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+        try:
+            fd = os.open(tmp_path, TEMP_FLAGS, FILE_MODE)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def write_atomic(path, text):
+    os.replace(_write_temp(path, text), path)
+    return path
+
+
+class BatchWriter:
+    def __init__(self):
+        self.staged = []
+
+    def stage(self, path, text):
+        self.staged.append((_write_temp(path, text), path))
+        return path
+
+    def stage_device(self, path, data):
+        return self.stage(path, dump_device(data))
+
+    def commit(self):
+        committed = []
+        try:
+            while self.staged:
+                tmp_path, path = self.staged[0]
+                os.replace(tmp_path, path)
+                self.staged.pop(0)
+                committed.append(path)
+        except BaseException:
+            # Drop the temp files still waiting so a failed commit leaves no .tmp files behind
+            self.rollback()
+            raise
+        return committed
+
+    def rollback(self):
+        while self.staged:
+            tmp_path, _ = self.staged.pop()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def benchmark(devices, rounds=3):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"{index}.yaml") for index in range(len(devices))]
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for path, data in zip(paths, devices):
+                with open(path, 'w') as f:
+                    yaml.dump(data, f, default_flow_style=False, sort_keys=False, width=120)
+        results['yaml.dump + open'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            with BatchWriter() as writer:
+                for path, data in zip(paths, devices):
+                    writer.stage_device(path, data)
+        results[f"{SafeDumper.__name__} + BatchWriter"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            texts = [dump_device(data) for data in devices]
+        results[f"{SafeDumper.__name__} (emit only)"] = time.perf_counter() - start
+
+        mismatched = sum(yaml.safe_load(text) != data for text, data in zip(texts, devices))
+
+    return {label: seconds / (rounds * max(len(devices), 1)) for label, seconds in results.items()}, mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the device YAML emitter against plain yaml.dump')
+    parser.add_argument('--devices-dir', default=DEFAULT_DEVICES_DIR, help='Directory containing <brand>/*.yaml device files')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Path of the compiled catalog cache')
+    parser.add_argument('--rounds', type=int, default=3, help='Number of passes over the catalog')
+    args = parser.parse_args()
+
+    try:
+        devices = [data for data in load_catalog(args.devices_dir, args.cache_file).values() if isinstance(data, dict)]
+        timings, mismatched = benchmark(devices, args.rounds)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for label, seconds in timings.items():
+        print(f"{label:<32} {seconds * 1e6:10.1f}us per device")
+    print(f"\n{len(devices)} devices, {mismatched} failed to round-trip")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())